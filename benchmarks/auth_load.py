@@ -0,0 +1,121 @@
+"""
+Event-loop lag while a burst of new sessions is verified inline vs. on a thread or process pool.
+
+A ticker coroutine sleeps 1 ms in a loop and records how late it wakes up; that lateness is what
+every in-flight tool call pays while signature checks hold the loop. Run from the repository root:
+
+    python -m benchmarks.auth_load [--sessions 2000] [--rate 4000] [--key-size 2048]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from benchmarks.auth_verify import AUDIENCE, DOMAIN, make_tokens, serve_jwks
+from utils.auth import Auth0TokenVerifier, SignatureOffload
+
+TICK = 0.001
+
+MODES = {
+    "inline": None,
+    "thread": {"pool": "thread", "auto_threshold": 0},
+    "thread auto": {"pool": "thread", "auto_threshold": 4},
+    "process": {"pool": "process", "auto_threshold": 0},
+    "process auto": {"pool": "process", "auto_threshold": 4},
+}
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def with_lag(work) -> tuple[list[float], object]:
+    """Await work while the ticker runs; return (lags, result)."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    try:
+        result = await work
+    finally:
+        stop.set()
+        await tick_task
+    return lags, result
+
+
+def lag_columns(lags: list[float]) -> str:
+    return (
+        f"{percentile(lags, 50) * 1000:>8.2f}ms{percentile(lags, 99) * 1000:>8.2f}ms{max(lags) * 1000:>8.2f}ms"
+    )
+
+
+async def burst(verifier: Auth0TokenVerifier, tokens: list[str], rate: float) -> float:
+    """Start one verification per token at rate per second; return seconds until all finished."""
+    batch = 10
+    tasks = []
+    started = time.perf_counter()
+    for i in range(0, len(tokens), batch):
+        tasks.extend(asyncio.create_task(verifier.verify_token(token)) for token in tokens[i:i + batch])
+        await asyncio.sleep(batch / rate)
+    results = await asyncio.gather(*tasks)
+    assert all(result is not None for result in results)
+    return time.perf_counter() - started
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+async def run(sessions: int, rate: float, key_size: int, workers: int) -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "bench-rs256", "use": "sig", "alg": "RS256"})
+    server = serve_jwks({"keys": [jwk]})
+    jwks_url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    print(f"Signing {sessions:,} tokens (RS256, {key_size}-bit key)...")
+    tokens = make_tokens(private_key, "bench-rs256", sessions)
+
+    print(
+        f"{sessions:,} new sessions arriving at {rate:,.0f}/s, no token cache, "
+        f"{workers} pool workers, {os.cpu_count()} CPUs"
+    )
+    print(f"  {'mode':<14}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'burst':>10}   offloaded")
+    try:
+        # Baseline: the same ticker on an idle loop
+        lags, _ = await with_lag(asyncio.sleep(0.5))
+        print(f"  {'idle':<14}{lag_columns(lags)}")
+
+        for mode, options in MODES.items():
+            offload = SignatureOffload(max_workers=workers, **options) if options else None
+            verifier = Auth0TokenVerifier(DOMAIN, AUDIENCE, jwks_url=jwks_url, offload=offload)
+            await verifier.start()
+            try:
+                lags, elapsed = await with_lag(burst(verifier, tokens, rate))
+            finally:
+                await verifier.stop()
+            offloaded = f"{offload.offloaded:,}/{sessions:,}" if offload else "-"
+            print(f"  {mode:<14}{lag_columns(lags)}{elapsed:>9.2f}s   {offloaded}")
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=4000, help="new sessions per second")
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.rate, args.key_size, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Bearer token verifications per second with and without the verified-token cache, how cheaply
+invalid tokens (garbage, expired, forged) are rejected, and the per-request cost of a full
+verification for each supported algorithm.
+
+Signs tokens with a throwaway RSA key and serves its JWKS from a local HTTP server, so no
+Auth0 tenant is needed. Run from the repository root:
+
+    python -m benchmarks.auth_verify [--requests 5000] [--sessions 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from utils.auth import Auth0TokenVerifier, RejectedTokenCache, VerifiedTokenCache
+
+DOMAIN = "bench.example.auth0.com"
+AUDIENCE = "https://bench.example.com/mcp"
+
+
+def serve_jwks(jwks: dict) -> ThreadingHTTPServer:
+    body = json.dumps(jwks).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_tokens(private_key, kid: str, count: int, lifetime: int = 3600, algorithm: str = "RS256") -> list[str]:
+    now = int(time.time())
+    return [
+        jwt.encode(
+            {
+                "iss": f"https://{DOMAIN}/",
+                "aud": AUDIENCE,
+                "sub": f"user-{i}",
+                "azp": f"client-{i}",
+                "iat": now - max(0, -lifetime) - 60,
+                "exp": now + lifetime,
+                "scope": "openid profile email",
+            },
+            private_key,
+            algorithm=algorithm,
+            headers={"kid": kid},
+        )
+        for i in range(count)
+    ]
+
+
+async def measure(verifier: Auth0TokenVerifier, tokens: list[str], requests: int) -> float:
+    """Verify requests tokens (cycling through one per session); return verifications/sec."""
+    # Warm the JWKS so both runs measure steady state
+    assert await verifier.verify_token(tokens[0]) is not None
+    started = time.perf_counter()
+    for i in range(requests):
+        assert await verifier.verify_token(tokens[i % len(tokens)]) is not None
+    return requests / (time.perf_counter() - started)
+
+
+async def measure_rejections(verifier: Auth0TokenVerifier, tokens: list[str], requests: int) -> float:
+    """Present invalid tokens (replayed from a small set); return rejections/sec."""
+    # The verifier prints full-verification failures; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for i in range(requests):
+            assert await verifier.verify_token(tokens[i % len(tokens)]) is None
+        return requests / (time.perf_counter() - started)
+
+
+async def run(requests: int, sessions: int) -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "bench-rs256", "use": "sig", "alg": "RS256"})
+    server = serve_jwks({"keys": [jwk]})
+    jwks_url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    tokens = make_tokens(private_key, "bench-rs256", sessions)
+
+    uncached = Auth0TokenVerifier(DOMAIN, AUDIENCE, jwks_url=jwks_url)
+    cached = Auth0TokenVerifier(DOMAIN, AUDIENCE, jwks_url=jwks_url, token_cache=VerifiedTokenCache())
+    try:
+        for verifier in (uncached, cached):
+            await verifier.start()
+        without_cache = await measure(uncached, tokens, requests)
+        with_cache = await measure(cached, tokens, requests)
+    finally:
+        for verifier in (uncached, cached):
+            await verifier.stop()
+        server.shutdown()
+
+    print(f"{requests:,} requests across {sessions} sessions (RS256, 2048-bit key)")
+    print(f"  without cache: {without_cache:>12,.0f} verifications/sec")
+    print(f"  with cache:    {with_cache:>12,.0f} verifications/sec ({with_cache / without_cache:.0f}x)")
+    print(f"  verifier stats: {json.dumps(cached.stats())}")
+
+    # Invalid traffic: each kind replayed from a small set, as a misbehaving client would
+    forger = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    invalid = {
+        "garbage": [f"not-a-jwt-{i}" for i in range(sessions)],
+        "expired": make_tokens(private_key, "bench-rs256", sessions, lifetime=-60),
+        "wrong audience": [
+            jwt.encode({"iss": f"https://{DOMAIN}/", "aud": "https://elsewhere", "exp": int(time.time()) + 3600},
+                       private_key, algorithm="RS256", headers={"kid": "bench-rs256"})
+            for _ in range(sessions)
+        ],
+        "forged signature": make_tokens(forger, "bench-rs256", sessions),
+    }
+    server = serve_jwks({"keys": [jwk]})
+    jwks_url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    guarded = Auth0TokenVerifier(DOMAIN, AUDIENCE, jwks_url=jwks_url, rejected_tokens=RejectedTokenCache())
+    unguarded = Auth0TokenVerifier(DOMAIN, AUDIENCE, jwks_url=jwks_url)
+    try:
+        await guarded.start()
+        await unguarded.start()
+        print(f"\nInvalid tokens, {requests:,} requests per kind")
+        print(f"  {'':<18}{'no negative cache':>20}{'negative cache':>18}")
+        for kind, tokens in invalid.items():
+            without_negative = await measure_rejections(unguarded, tokens, requests)
+            with_negative = await measure_rejections(guarded, tokens, requests)
+            print(f"  {kind:<18}{without_negative:>14,.0f} rej/s{with_negative:>12,.0f} rej/s")
+    finally:
+        await guarded.stop()
+        await unguarded.stop()
+        server.shutdown()
+    print(f"  verifier stats: {json.dumps(guarded.stats())}")
+
+
+async def run_algorithms(requests: int, sessions: int) -> None:
+    """Per-request cost of a full verification (no token cache) for each supported algorithm."""
+    keys = {
+        "RS256": (rsa.generate_private_key(public_exponent=65537, key_size=2048), RSAAlgorithm),
+        "ES256": (ec.generate_private_key(ec.SECP256R1()), ECAlgorithm),
+        "EdDSA": (ed25519.Ed25519PrivateKey.generate(), OKPAlgorithm),
+    }
+    jwks = []
+    for algorithm, (private_key, algorithm_class) in keys.items():
+        jwk = json.loads(algorithm_class.to_jwk(private_key.public_key()))
+        jwk.update({"kid": f"bench-{algorithm}", "use": "sig", "alg": algorithm})
+        jwks.append(jwk)
+    server = serve_jwks({"keys": jwks})
+    jwks_url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    verifier = Auth0TokenVerifier(DOMAIN, AUDIENCE, algorithms=list(keys), jwks_url=jwks_url)
+
+    print(f"\nFull verification cost per request ({requests:,} requests per algorithm, no token cache)")
+    print(f"  {'':<8}{'jwt.decode':>14}{'direct':>14}")
+    try:
+        await verifier.start()
+        for algorithm, (private_key, _) in keys.items():
+            tokens = make_tokens(private_key, f"bench-{algorithm}", sessions, algorithm=algorithm)
+            signing_key = await verifier.jwks_client.get_signing_key(f"bench-{algorithm}")
+
+            # What verify_token did before: jwt.decode re-parses the token and re-resolves the key
+            started = time.perf_counter()
+            for i in range(requests):
+                jwt.decode(
+                    tokens[i % sessions], signing_key.key, algorithms=[algorithm],
+                    audience=AUDIENCE, issuer=f"https://{DOMAIN}/",
+                )
+            decode_cost = (time.perf_counter() - started) / requests
+
+            direct_rate = await measure(verifier, tokens, requests)
+            print(f"  {algorithm:<8}{decode_cost * 1e6:>11,.0f} us{1e6 / direct_rate:>11,.0f} us")
+    finally:
+        await verifier.stop()
+        server.shutdown()
+    print(f"  verifier stats: {json.dumps(verifier.stats()['by_algorithm'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.sessions))
+    asyncio.run(run_algorithms(args.requests, args.sessions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory and speed of per-segment snippet objects vs. the compact TranscriptIndex.
+
+Run from the repository root:
+
+    python -m benchmarks.transcript_memory [--hours 1 3 10]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from youtube_transcript_api import FetchedTranscriptSnippet
+
+from utils.formatting import format_transcript
+from utils.transcript_index import TranscriptIndex
+
+WORDS = (
+    "the of and to in is that it for you was with on as have but be they this at from "
+    "transcript video model token cache memory python server request latency proxy"
+).split()
+
+# Auto-captions run at roughly one fragment every two to three seconds
+SEGMENTS_PER_HOUR = 1500
+
+
+def make_snippets(count: int, seed: int = 0) -> list[FetchedTranscriptSnippet]:
+    rng = random.Random(seed)
+    snippets = []
+    start = 0.0
+    for _ in range(count):
+        duration = round(rng.uniform(1.5, 4.0), 3)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10)))
+        snippets.append(FetchedTranscriptSnippet(text=text, start=round(start, 3), duration=duration))
+        start += duration
+    return snippets
+
+
+def measure(build) -> tuple[object, int]:
+    """Return (value, bytes allocated while building it and still alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    value = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, after - before
+
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(hours: float) -> None:
+    count = int(hours * SEGMENTS_PER_HOUR)
+    text_bytes = sum(len(s.text.encode("utf-8")) for s in make_snippets(count))
+
+    # The previous cache entry: the snippet list plus a parallel list of start times
+    segments, list_bytes = measure(lambda: (lambda s: (s, [e.start for e in s]))(make_snippets(count)))
+    snippets = segments[0]
+    # Only the compact copy is charged here; the snippets it is built from already exist
+    index, compact_bytes = measure(lambda: TranscriptIndex(snippets))
+
+    format_list = best_of(lambda: format_transcript(snippets))
+    format_compact = best_of(lambda: format_transcript(index))
+    search_list = best_of(lambda: [i for i, e in enumerate(snippets) if "latency" in e.text.lower()])
+    search_compact = best_of(lambda: index.search("latency"))
+    window_list = best_of(lambda: snippets[count // 4:count // 2])
+    window_compact = best_of(lambda: index.window(start_time=index.starts[count // 4], end_time=index.starts[count // 2]))
+
+    print(f"\n{hours:g} h video: {count:,} segments, {text_bytes:,} bytes of text")
+    print(f"  {'':<22}{'snippet list':>14}{'compact':>14}{'ratio':>8}")
+    print(f"  {'memory (bytes)':<22}{list_bytes:>14,}{compact_bytes:>14,}{list_bytes / compact_bytes:>7.1f}x")
+    print(f"  {'bytes per segment':<22}{list_bytes / count:>14.0f}{compact_bytes / count:>14.0f}")
+    print(f"  {'format_transcript (ms)':<22}{format_list * 1000:>14.2f}{format_compact * 1000:>14.2f}")
+    print(f"  {'search (ms)':<22}{search_list * 1000:>14.2f}{search_compact * 1000:>14.2f}")
+    print(f"  {'slice half (ms)':<22}{window_list * 1000:>14.3f}{window_compact * 1000:>14.3f}")
+    print(f"  cache charge (estimate_size): {index.nbytes + 256:,} bytes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.25, 1, 3, 10])
+    args = parser.parse_args()
+    for hours in args.hours:
+        run(hours)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,42 @@
 import re
 import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TypedDict
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.auth.middleware.auth_context import get_access_token
 from mcp.server.auth.settings import AuthSettings
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.proxies import GenericProxyConfig
 from pydantic import AnyHttpUrl
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from utils.auth import create_auth0_verifier
+from utils.cache import Revalidator, create_negative_cache, create_transcript_cache
+from utils.deadlines import deadline, tool_deadline
+from utils.executor import create_fetch_executor
+from utils.formatting import (
+    ANNOTATABLE_FORMATS,
+    format_transcript,
+    get_format,
+    iter_transcript_chunks,
+    merge_segments,
+    render_transcript,
+    savings_note,
+    structured_segments,
+)
+from utils.playlists import resolve_video_ids, youtube_base_url_from_env
+from utils.ratelimit import create_rate_limiter
+from utils.retry import create_retry_policy
+from utils.scheduler import create_client_scheduler
+from utils.singleflight import SingleFlight
+from utils.store import create_transcript_store
+from utils.transcript_index import TranscriptIndex
+from utils.hedging import create_hedge_policy
+from utils.proxies import VIDEO_ERRORS, NoHealthyProxy, create_proxy_pool, is_proxy_failure
+from utils.youtube import create_transcript_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,6 +50,16 @@ if not auth0_domain:
 if not resource_server_url:
     raise ValueError("RESOURCE_SERVER_URL environment variable is required")
 
+# Batch tool limits
+batch_max_urls = int(os.getenv("BATCH_MAX_URLS", "50"))
+batch_max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+playlist_max_videos = int(os.getenv("PLAYLIST_MAX_VIDEOS", "200"))
+
+# Characters per progress notification when fetch_video_transcript streams
+stream_chunk_chars = int(os.getenv("STREAM_CHUNK_CHARS", "4000"))
+
+VIDEO_ID_PATTERN = re.compile(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*')
+
 # Load server instructions
 with open("prompts/server_instructions.md", "r") as file:
     server_instructions = file.read()
@@ -29,11 +67,63 @@ with open("prompts/server_instructions.md", "r") as file:
 # Initialize Auth0 token verifier
 token_verifier = create_auth0_verifier()
 
+# Bounds concurrent upstream fetches and queues the rest (fetches are async; no threads involved)
+fetch_executor = create_fetch_executor()
+
+# Long-lived async transcript client (pooled connections per proxy)
+transcript_client = create_transcript_client()
+
+# Upstream proxies with per-proxy circuit breakers and background health probes
+proxy_pool = create_proxy_pool()
+
+# Retries transient upstream failures (blocks, 5xx, proxy resets) with jittered backoff;
+# blocks only when another proxy can take the retry
+retry_policy = create_retry_policy(retryable=proxy_pool.worth_retrying, unavailable=(NoHealthyProxy,))
+
+# Optional backup request through a second proxy when the first is unusually slow
+hedge_policy = create_hedge_policy()
+
+# Token buckets (global and optionally per proxy) pacing upstream fetches
+rate_limiter = create_rate_limiter()
+
+# Per-client quotas and weighted fair queuing of upstream fetches
+client_scheduler = create_client_scheduler()
+
+# In-memory LRU of formatted transcripts, bounded by TTL and total bytes
+transcript_cache = create_transcript_cache()
+
+# Short-lived memory of disabled/unavailable videos so repeats skip the proxy round-trip
+negative_cache = create_negative_cache()
+
+# Background refreshes for expired cache entries served stale (one per video/language)
+revalidator = Revalidator()
+
+# Durable SQLite store so restarts serve previously fetched transcripts from disk
+transcript_store = create_transcript_store()
+
+# Concurrent requests for the same video share one store lookup / upstream fetch
+transcript_flights = SingleFlight()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # Signing keys are in memory before the first request arrives
+    await token_verifier.start()
+    proxy_pool.start_health_checks(transcript_client)
+    try:
+        yield
+    finally:
+        await token_verifier.stop()
+        await proxy_pool.stop_health_checks()
+        await transcript_client.aclose()
+        fetch_executor.shutdown()
+        transcript_store.close()
+
 # Create an MCP server with OAuth authentication
 mcp = FastMCP(
     "yt-mcp",
     instructions=server_instructions,
     host="0.0.0.0",
+    lifespan=lifespan,
     # OAuth Configuration
     token_verifier=token_verifier,
     auth=AuthSettings(
@@ -43,66 +133,414 @@ mcp = FastMCP(
     ),
 )
 
+def current_client_id() -> str:
+    """OAuth client_id (azp) of the authenticated caller"""
+    access_token = get_access_token()
+    return access_token.client_id if access_token else "anonymous"
+
+async def load_transcript(video_id: str, language: str):
+    """Load a transcript from the store, falling back to an upstream fetch"""
+    transcript = await transcript_store.get(video_id, language)
+    if transcript is None:
+        transcript = await fetch_and_store(video_id, language)
+    return transcript
+
+async def fetch_and_store(video_id: str, language: str, charge_quota: bool = True):
+    """Fetch a transcript from upstream and write it to the store"""
+    # Upstream capacity is shared fairly between OAuth clients: the fetch starts on the first fair
+    # share of any client waiting for it, and only now (going upstream) is the quota charged
+    try:
+        async with client_scheduler.slot(current_client_id(), key=(video_id, language), charge=charge_quota):
+            # Each attempt takes its own executor slot and proxy, so backoff sleeps hold neither
+            transcript = await retry_policy.run(fetch_executor.run_async, fetch_upstream, video_id, language)
+    except Exception as e:
+        negative_cache.record(video_id, language, e)
+        raise
+    await transcript_store.put(transcript, language)
+    return transcript
+
+async def refresh_transcript(video_id: str, language: str) -> None:
+    """Refetch a stale cached transcript and replace every cached format of it"""
+    # Background work the caller didn't wait for, so it isn't charged to their quota
+    transcript = await fetch_and_store(video_id, language, charge_quota=False)
+    transcript_cache.discard(video_id, language)
+    transcript_cache.put((video_id, language, "segments"), TranscriptIndex(transcript))
+
+async def fetch_upstream(video_id: str, language: str):
+    """Fetch a transcript from YouTube through a proxy chosen by the pool, hedging slow attempts"""
+    proxy = proxy_pool.select()
+    if not hedge_policy.enabled or len(proxy_pool.endpoints) < 2:
+        return await fetch_via_proxy(proxy, video_id, language)
+
+    async def hedge():
+        # The backup attempt must leave through a different exit IP
+        return await fetch_via_proxy(proxy_pool.select(exclude=(proxy,)), video_id, language)
+
+    return await hedge_policy.run(lambda: fetch_via_proxy(proxy, video_id, language), hedge)
+
+async def fetch_via_proxy(proxy, video_id: str, language: str):
+    """Fetch a transcript through one proxy, recording its health"""
+    await rate_limiter.acquire(proxy.name)
+    proxy.in_flight += 1
+    started = time.monotonic()
+    try:
+        transcript = await transcript_client.fetch(video_id, languages=[language], proxy_url=proxy.url)
+    except VIDEO_ERRORS:
+        # The proxy did its job; the video itself has no usable transcript
+        proxy_pool.record_success(proxy, time.monotonic() - started)
+        raise
+    except Exception as e:
+        # Anything else (unparsable page, 4xx, bugs) says nothing about the proxy either way
+        if is_proxy_failure(e):
+            proxy_pool.record_failure(proxy, e)
+        raise
+    finally:
+        proxy.in_flight -= 1
+    proxy_pool.record_success(proxy, time.monotonic() - started)
+    return transcript
+
+def extract_video_id(url: str) -> str:
+    """Extract the 11-character video ID from a YouTube URL"""
+    video_id_match = VIDEO_ID_PATTERN.search(url)
+
+    if not video_id_match:
+        raise ValueError("Invalid YouTube URL")
+
+    return video_id_match.group(1)
+
+async def get_transcript_index(video_id: str, language: str) -> TranscriptIndex:
+    """Return the parsed, start-time indexed transcript, serving from the in-memory cache when possible"""
+    cache_key = (video_id, language, "segments")
+    cached = transcript_cache.lookup(cache_key)
+    if cached is not None:
+        index, stale = cached
+        if stale:
+            # Serve the expired copy now; refresh it in the background
+            revalidator.refresh((video_id, language), refresh_transcript, video_id, language)
+        return index
+
+    try:
+        # Known-dead videos fail here with their original error, without an upstream call
+        negative_cache.check(video_id, language)
+        # Every caller waiting on the shared load is queued (and can be charged) for its fetch
+        with client_scheduler.interest((video_id, language), current_client_id()):
+            transcript = await transcript_flights.do(
+                (video_id, language), load_transcript, video_id, language
+            )
+    except Exception as e:
+        raise Exception(f"Error fetching transcript with proxy: {str(e)}")
+
+    index = TranscriptIndex(transcript)
+    transcript_cache.put(cache_key, index)
+    return index
+
+def text_cache_key(video_id: str, language: str, format: str, granularity: str, interval: float) -> tuple:
+    if format == "text" and granularity == "raw":
+        return (video_id, language, "text")
+    return (video_id, language, f"{format}:{granularity}:{interval:g}")
+
+def entry_separator(format: str, granularity: str) -> str | None:
+    """Paragraphs are separated by a blank line in the line-per-entry formats"""
+    return "\n\n" if granularity == "paragraph" and format in ANNOTATABLE_FORMATS else None
+
+async def get_formatted_transcript(
+    video_id: str, language: str, format: str = "text", granularity: str = "raw", interval: float = 30
+) -> str:
+    """Return the rendered transcript, serving from the in-memory cache when possible"""
+    cache_key = text_cache_key(video_id, language, format, granularity, interval)
+    cached = transcript_cache.lookup(cache_key)
+    if cached is not None:
+        formatted, stale = cached
+        if stale:
+            revalidator.refresh((video_id, language), refresh_transcript, video_id, language)
+        return formatted
+
+    get_format(format)  # fail on unknown formats before fetching anything
+    index = await get_transcript_index(video_id, language)
+    segments, raw_chars = merge_segments(index, granularity, interval, format)
+    formatted = render_transcript(segments, format, entry_separator(format, granularity))
+    if granularity != "raw" and format in ANNOTATABLE_FORMATS:
+        formatted += "\n\n" + savings_note(granularity, raw_chars, len(formatted))
+    # Lives no longer than the index it was rendered from; dropped if a refresh replaced that index
+    transcript_cache.put_derived(cache_key, formatted, (video_id, language, "segments"), index)
+    return formatted
+
+async def fetch_many(
+    urls: list[str], language: str, max_concurrency: int, timeout: float, on_result=None
+) -> list[dict]:
+    """
+    Fetch transcripts for urls concurrently, returning per-URL results or errors in input order.
+    Videos still pending after timeout seconds are cancelled and reported as errors.
+    """
+    semaphore = asyncio.Semaphore(max(1, min(max_concurrency, batch_max_concurrency)))
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + timeout
+
+    async def fetch_one(url: str) -> dict:
+        result = {"url": url, "video_id": None}
+        try:
+            result["video_id"] = extract_video_id(url)
+            async with deadline(max(0.0, deadline_at - loop.time()), "Transcript fetch"):
+                async with semaphore:
+                    result["transcript"] = await get_formatted_transcript(result["video_id"], language)
+        except Exception as e:
+            # One bad video shouldn't fail the whole batch
+            result["error"] = str(e)
+        if on_result is not None:
+            await on_result(result)
+        return result
+
+    # One quota request per batch, paid up front, instead of one per video it has to fetch
+    with client_scheduler.prepaid(current_client_id()):
+        return await asyncio.gather(*(fetch_one(url) for url in urls))
+
 @mcp.tool()
-def fetch_video_transcript(url: str) -> str:
+async def fetch_video_transcript(
+    url: str,
+    ctx: Context,
+    language: str = "en",
+    stream: bool = False,
+    granularity: str = "raw",
+    interval: float = 30,
+    format: str = "text",
+) -> str:
     """
     Extract transcript with timestamps from a YouTube video URL and format it for LLM consumption
 
     Args:
         url (str): YouTube video URL
+        language (str): Transcript language code (default: "en")
+        stream (bool): Also deliver the transcript in chunks as progress notifications
+                       while it is formatted (requires the client to send a progress token)
+        granularity (str): How caption fragments are merged to save tokens:
+            - raw: one line per caption fragment (default)
+            - sentence: one line per sentence
+            - paragraph: one paragraph per `interval` seconds, ending on a sentence boundary
+            - timestamp: one line (and timestamp) per `interval` seconds
+        interval (float): Seconds per paragraph / timestamp line (default: 30)
+        format (str): Output format:
+            - text: "[MM:SS] Text" lines, "[H:MM:SS]" past the first hour (default)
+            - plain: text only, no timestamps
+            - srt / vtt: SubRip or WebVTT subtitles
+            - json: JSON array of {"start", "duration", "text"} objects
 
     Returns:
-        str: Formatted transcript with timestamps, where each entry is on a new line
-             in the format: "[MM:SS] Text"
+        str: Transcript in the requested format. For text and plain, merged granularities end
+             with a line reporting the character/token savings versus raw.
     """
-    # Extract video ID from URL
-    video_id_pattern = r'(?:v=|\/)([0-9A-Za-z_-]{11}).*'
-    video_id_match = re.search(video_id_pattern, url)
+    video_id = extract_video_id(url)
+    interval = max(interval, 1)
+    async with deadline(tool_deadline("fetch_video_transcript", ctx), "fetch_video_transcript"):
+        if not stream:
+            return await get_formatted_transcript(video_id, language, format, granularity, interval)
 
-    if not video_id_match:
-        raise ValueError("Invalid YouTube URL")
+        get_format(format)
+        index = await get_transcript_index(video_id, language)
+        segments, raw_chars = merge_segments(index, granularity, interval, format)
+        separator = entry_separator(format, granularity) or get_format(format).separator
+        chunks = []
+        for done, chunk in iter_transcript_chunks(segments, stream_chunk_chars, format, separator):
+            chunks.append(chunk)
+            await ctx.report_progress(done, len(segments), chunk)
 
-    video_id = video_id_match.group(1)
+    formatted = separator.join(chunks)
+    if granularity != "raw" and format in ANNOTATABLE_FORMATS:
+        note = savings_note(granularity, raw_chars, len(formatted))
+        await ctx.report_progress(len(segments), len(segments), note)
+        formatted += "\n\n" + note
+    transcript_cache.put_derived(
+        text_cache_key(video_id, language, format, granularity, interval), formatted,
+        (video_id, language, "segments"), index,
+    )
+    return formatted
 
-    def format_transcript(transcript):
-        """Format transcript entries with timestamps"""
-        formatted_entries = []
-        for entry in transcript:
-            # Convert seconds to MM:SS format
-            minutes = int(entry.start // 60)
-            seconds = int(entry.start % 60)
-            timestamp = f"[{minutes:02d}:{seconds:02d}]"
+class TranscriptSegments(TypedDict):
+    video_id: str
+    language: str
+    starts: list[float]
+    durations: list[float]
+    texts: list[str]
+
+@mcp.tool()
+async def fetch_transcript_segments(
+    url: str,
+    ctx: Context,
+    language: str = "en",
+    granularity: str = "raw",
+    interval: float = 30,
+) -> TranscriptSegments:
+    """
+    Fetch a transcript as structured data (parallel arrays of start times, durations and texts)
 
-            formatted_entry = f"{timestamp} {entry.text}"
-            formatted_entries.append(formatted_entry)
+    Args:
+        url (str): YouTube video URL
+        language (str): Transcript language code (default: "en")
+        granularity (str): raw, sentence, paragraph or timestamp (see fetch_video_transcript)
+        interval (float): Seconds per paragraph / timestamp segment (default: 30)
 
-        # Join all entries with newlines
-        return "\n".join(formatted_entries)
+    Returns:
+        dict: "video_id", "language", and "starts" / "durations" (seconds) and "texts" arrays,
+              one element per segment
+    """
+    video_id = extract_video_id(url)
+    interval = max(interval, 1)
+    async with deadline(tool_deadline("fetch_transcript_segments", ctx), "fetch_transcript_segments"):
+        index = await get_transcript_index(video_id, language)
+    segments, _ = merge_segments(index, granularity, interval)
+    return {"video_id": video_id, "language": language, **structured_segments(segments)}
 
-    try:
-        # Get proxy credentials from environment
-        proxy_username = os.getenv("PROXY_USERNAME")
-        proxy_password = os.getenv("PROXY_PASSWORD")
-        proxy_url_base = os.getenv("PROXY_URL")
+@mcp.tool()
+async def fetch_transcript_window(
+    url: str,
+    ctx: Context,
+    language: str = "en",
+    start_time: float | None = None,
+    end_time: float | None = None,
+    cursor: int | None = None,
+    max_chars: int = 20000,
+) -> dict:
+    """
+    Fetch part of a transcript by time range and/or cursor, instead of the whole thing
+
+    Args:
+        url (str): YouTube video URL
+        language (str): Transcript language code (default: "en")
+        start_time (float): Start of the window in seconds (default: beginning of the video)
+        end_time (float): End of the window in seconds (default: end of the video)
+        cursor (int): "next_cursor" from a previous call, to continue where it stopped
+        max_chars (int): Approximate maximum size of the returned transcript text
+
+    Returns:
+        dict: "video_id", "transcript" (same format as fetch_video_transcript), "total_segments",
+              and "next_cursor" (pass back as cursor to get the next page, or null when done)
+    """
+    video_id = extract_video_id(url)
+    async with deadline(tool_deadline("fetch_transcript_window", ctx), "fetch_transcript_window"):
+        index = await get_transcript_index(video_id, language)
+    segments, next_cursor = index.window(
+        start_time=start_time, end_time=end_time, cursor=cursor, max_chars=max(1, max_chars)
+    )
+    return {
+        "video_id": video_id,
+        "transcript": format_transcript(segments),
+        "total_segments": len(index),
+        "next_cursor": next_cursor,
+    }
+
+@mcp.tool()
+async def search_transcript(
+    url: str, query: str, ctx: Context, language: str = "en", max_results: int = 50
+) -> dict:
+    """
+    Find the transcript lines that mention a word or phrase
+
+    Args:
+        url (str): YouTube video URL
+        query (str): Text to look for (case-insensitive)
+        language (str): Transcript language code (default: "en")
+        max_results (int): Maximum number of matching lines to return
+
+    Returns:
+        dict: "video_id", "query", "matches" (matching lines in "[MM:SS] Text" format),
+              "total_segments"
+    """
+    video_id = extract_video_id(url)
+    async with deadline(tool_deadline("search_transcript", ctx), "search_transcript"):
+        index = await get_transcript_index(video_id, language)
+    hits = index.search(query, max_results=max(1, max_results))
+    return {
+        "video_id": video_id,
+        "query": query,
+        "matches": format_transcript(index.select(hits)),
+        "total_segments": len(index),
+    }
+
+@mcp.tool()
+async def fetch_video_transcripts(
+    urls: list[str], ctx: Context, language: str = "en", max_concurrency: int = 4
+) -> list[dict]:
+    """
+    Extract transcripts for several YouTube videos in one call, fetching them concurrently
+
+    Args:
+        urls (list[str]): YouTube video URLs
+        language (str): Transcript language code (default: "en")
+        max_concurrency (int): Maximum transcripts fetched at once (capped by the server)
+
+    Returns:
+        list[dict]: One entry per URL, in input order, with "url", "video_id" and either
+                    "transcript" (same format as fetch_video_transcript) or "error"
+    """
+    if len(urls) > batch_max_urls:
+        raise ValueError(f"Too many URLs: {len(urls)} (maximum is {batch_max_urls})")
 
-        if not proxy_username or not proxy_password or not proxy_url_base:
-            raise ValueError("Proxy credentials not configured. Set PROXY_USERNAME, PROXY_PASSWORD, and PROXY_URL environment variables.")
+    # Per-video deadline, so whatever finished in time is still returned
+    return await fetch_many(urls, language, max_concurrency, tool_deadline("fetch_video_transcripts", ctx))
 
-        # Construct proxy URLs with credentials
-        http_proxy_url = f"http://{proxy_username}:{proxy_password}@{proxy_url_base}"
-        https_proxy_url = f"https://{proxy_username}:{proxy_password}@{proxy_url_base}"
+@mcp.tool()
+async def fetch_playlist_transcripts(
+    url: str,
+    ctx: Context,
+    language: str = "en",
+    max_videos: int = 50,
+    max_concurrency: int = 4,
+    include_transcripts: bool = True,
+) -> dict:
+    """
+    Resolve a YouTube playlist or channel URL to its videos and fetch every transcript concurrently
+
+    Args:
+        url (str): YouTube playlist URL (containing "list=") or channel URL (/@handle, /channel/..., /c/..., /user/...)
+        language (str): Transcript language code (default: "en")
+        max_videos (int): Maximum videos to include (capped by the server)
+        max_concurrency (int): Maximum transcripts fetched at once (capped by the server)
+        include_transcripts (bool): If False, only per-video status is returned; transcripts stay
+                                    stored and can be read with fetch_video_transcript
 
-        proxy_config = GenericProxyConfig(
-            http_url=http_proxy_url,
-            https_url=https_proxy_url
+    Returns:
+        dict: "source", "video_count", "fetched", "failed" and "results" (one entry per video,
+              same shape as fetch_video_transcripts)
+    """
+    max_videos = max(1, min(max_videos, playlist_max_videos))
+    time_budget = tool_deadline("fetch_playlist_transcripts", ctx)
+    started = time.monotonic()
+    async with deadline(time_budget, "Resolving the playlist"):
+        video_ids = await resolve_video_ids(
+            transcript_client.get_client(proxy_pool.select().url),
+            url,
+            max_videos=max_videos,
+            base_url=youtube_base_url_from_env(),
         )
+    await ctx.report_progress(0, len(video_ids), f"Resolved {len(video_ids)} videos")
 
-        ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
-        transcript = ytt_api.fetch(video_id)
-        return format_transcript(transcript)
+    completed = 0
 
-    except Exception as e:
-        raise Exception(f"Error fetching transcript with proxy: {str(e)}")
+    async def on_result(result: dict) -> None:
+        nonlocal completed
+        completed += 1
+        await ctx.report_progress(completed, len(video_ids), f"Fetched {result['video_id']}")
+
+    watch_urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids]
+    results = await fetch_many(
+        watch_urls,
+        language,
+        max_concurrency,
+        time_budget - (time.monotonic() - started),
+        on_result=on_result,
+    )
+
+    failed = sum(1 for result in results if "error" in result)
+    if not include_transcripts:
+        for result in results:
+            result.pop("transcript", None)
+
+    return {
+        "source": url,
+        "video_count": len(video_ids),
+        "fetched": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
 
 @mcp.tool()
 def fetch_instructions(prompt_name: str) -> str:
@@ -124,5 +562,23 @@ def fetch_instructions(prompt_name: str) -> str:
     with open(prompt_path, "r") as f:
         return f.read()
 
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Expose transcript fetch queue depth and counters"""
+    return JSONResponse({
+        "fetch_executor": fetch_executor.stats(),
+        "transcript_cache": transcript_cache.stats(),
+        "negative_cache": negative_cache.stats(),
+        "revalidation": revalidator.stats(),
+        "transcript_store": transcript_store.stats(),
+        "singleflight": transcript_flights.stats(),
+        "proxy_pool": proxy_pool.stats(),
+        "retries": retry_policy.stats(),
+        "hedging": hedge_policy.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "client_scheduler": client_scheduler.stats(),
+        "auth": token_verifier.stats(),
+    })
+
 if __name__ == "__main__":
     mcp.run(transport='streamable-http')
\ No newline at end of file
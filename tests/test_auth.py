@@ -0,0 +1,328 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from utils.auth import MAX_TOKEN_CHARS, AsyncJWKSClient, Auth0TokenVerifier, RejectedTokenCache, SignatureOffload
+
+DOMAIN = "test.example.auth0.com"
+AUDIENCE = "https://test.example.com/mcp"
+ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+KEYS = {
+    "RS256": (rsa.generate_private_key(public_exponent=65537, key_size=2048), RSAAlgorithm),
+    "ES256": (ec.generate_private_key(ec.SECP256R1()), ECAlgorithm),
+    "EdDSA": (ed25519.Ed25519PrivateKey.generate(), OKPAlgorithm),
+}
+
+
+@pytest.fixture(scope="module")
+def jwks_url():
+    jwks = []
+    for algorithm, (private_key, algorithm_class) in KEYS.items():
+        jwk = json.loads(algorithm_class.to_jwk(private_key.public_key()))
+        jwk.update({"kid": f"kid-{algorithm}", "use": "sig", "alg": algorithm})
+        jwks.append(jwk)
+    body = json.dumps({"keys": jwks}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    server.shutdown()
+
+
+def make_token(algorithm: str = "RS256", kid: str | None = None, signing_key=None, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": f"https://{DOMAIN}/",
+        "aud": AUDIENCE,
+        "azp": "client-1",
+        "iat": now - 60,
+        "exp": now + 3600,
+        "scope": "openid profile",
+    }
+    payload.update(claims)
+    payload = {name: value for name, value in payload.items() if value is not None}
+    headers = {"kid": kid if kid is not None else f"kid-{algorithm}"}
+    return jwt.encode(payload, signing_key or KEYS[algorithm][0], algorithm=algorithm, headers=headers)
+
+
+def with_signature(token: str, signature: bytes) -> str:
+    header, payload, _ = token.split(".")
+    return f"{header}.{payload}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode('ascii')}"
+
+
+def verify(jwks_url: str, *tokens: str, **options):
+    """Verify tokens in order with a fresh verifier; return (results, verifier)."""
+
+    async def run():
+        verifier = Auth0TokenVerifier(
+            DOMAIN, AUDIENCE, algorithms=options.pop("algorithms", ALGORITHMS), jwks_url=jwks_url,
+            rejected_tokens=options.pop("rejected_tokens", RejectedTokenCache()), **options,
+        )
+        await verifier.start()
+        try:
+            return [await verifier.verify_token(token) for token in tokens], verifier
+        finally:
+            await verifier.stop()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_valid_token_for_each_algorithm(jwks_url, algorithm):
+    (access_token,), verifier = verify(jwks_url, make_token(algorithm))
+    assert access_token is not None
+    assert access_token.client_id == "client-1"
+    assert access_token.scopes == ["openid", "profile"]
+    assert access_token.resource == AUDIENCE
+    assert verifier.stats()["by_algorithm"][algorithm]["verifications"] == 1
+
+
+def test_offloaded_verification(jwks_url):
+    forged = make_token("RS256", signing_key=rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    offload = SignatureOffload(pool="thread", max_workers=1, auto_threshold=0)
+    results, _ = verify(jwks_url, make_token("RS256"), make_token("ES256"), forged, offload=offload)
+    assert [result is not None for result in results] == [True, True, False]
+    # forged signatures still run in the pool; only passing checks count as offloaded
+    assert offload.offloaded == 2
+    assert offload.inline == 0
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_forged_signature(jwks_url, algorithm):
+    forger = {
+        "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate,
+    }[algorithm]()
+    (result,), _ = verify(jwks_url, make_token(algorithm, signing_key=forger))
+    assert result is None
+
+
+def test_tampered_payload(jwks_url):
+    header, _, signature = make_token("RS256").split(".")
+    other_payload = make_token("RS256", azp="someone-else").split(".")[1]
+    (result,), _ = verify(jwks_url, f"{header}.{other_payload}.{signature}")
+    assert result is None
+
+
+def test_algorithm_confusion(jwks_url):
+    # ES256 header naming the RSA key: the key's own algorithm wins
+    confused = make_token("ES256", kid="kid-RS256")
+    (result,), _ = verify(jwks_url, confused)
+    assert result is None
+
+
+@pytest.mark.parametrize("length", [0, 63, 65, 72])
+def test_es256_signature_of_the_wrong_length(jwks_url, length):
+    token = make_token("ES256")
+    signature = base64.urlsafe_b64decode(token.split(".")[2] + "==")
+    (result,), _ = verify(jwks_url, with_signature(token, (signature * 2)[:length]))
+    assert result is None
+
+
+def test_audience_as_string_or_list(jwks_url):
+    results, _ = verify(
+        jwks_url,
+        make_token(aud=AUDIENCE),
+        make_token(aud=["https://other.example.com", AUDIENCE]),
+        make_token(aud=["https://other.example.com"]),
+        make_token(aud="https://other.example.com"),
+    )
+    assert [result is not None for result in results] == [True, True, False, False]
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"iss": "https://evil.example.com/"},
+        {"exp": int(time.time()) - 10},
+        {"exp": None},
+        {"nbf": int(time.time()) + 600},
+        {"iat": int(time.time()) + 600},
+        {"iat": "yesterday"},
+    ],
+)
+def test_invalid_claims(jwks_url, claims):
+    (result,), _ = verify(jwks_url, make_token(**claims))
+    assert result is None
+
+
+def test_unknown_kid(jwks_url):
+    (result,), verifier = verify(jwks_url, make_token("RS256", kid="rotated-away"))
+    assert result is None
+    assert verifier.jwks_client.stats()["keys"] == 3
+
+
+def test_scopes_from_permissions(jwks_url):
+    (access_token,), _ = verify(jwks_url, make_token(scope=None, permissions=["read:transcripts"]))
+    assert access_token.scopes == ["read:transcripts"]
+
+
+def unsigned_token(header: dict, payload: dict | list) -> str:
+    segments = [json.dumps(part).encode("utf-8") for part in (header, payload)] + [b"signature"]
+    return ".".join(base64.urlsafe_b64encode(segment).rstrip(b"=").decode("ascii") for segment in segments)
+
+
+@pytest.mark.parametrize(
+    "token, reason",
+    [
+        ("not-a-jwt", "malformed"),
+        ("a.b", "malformed"),
+        ("a..c", "malformed"),
+        ("!!!.???.***", "malformed"),
+        (unsigned_token({"alg": "RS256", "kid": "kid-RS256"}, ["not", "an", "object"]), "malformed"),
+        ("x" * (MAX_TOKEN_CHARS + 1), "malformed"),
+        (make_token(kid=""), "kid"),
+        (unsigned_token({"alg": "RS256"}, {}), "kid"),
+        (jwt.encode({"aud": AUDIENCE}, "a-shared-secret-of-32-bytes-long", algorithm="HS256", headers={"kid": "x"}), "algorithm"),
+        (unsigned_token({"alg": "none", "kid": "kid-RS256"}, {}), "algorithm"),
+        (make_token(exp=int(time.time()) - 10), "expired"),
+        (make_token(exp=None), "expired"),
+        (make_token(iss="https://evil.example.com/"), "issuer"),
+        (make_token(aud=None), "audience"),
+    ],
+)
+def test_precheck_rejects_and_remembers(jwks_url, token, reason):
+    (result, replay), verifier = verify(jwks_url, token, token)
+    stats = verifier.stats()
+    assert result is None and replay is None
+    assert stats["precheck_rejections"] == {reason: 1}
+    # never reached the key lookup or a signature check
+    assert stats["full_verifications"] == 0
+    assert stats["rejected_tokens"]["recorded"] == 1
+    assert stats["rejected_tokens"]["hits"] == 1
+
+
+def test_precheck_respects_configured_algorithms(jwks_url):
+    token = make_token("ES256")
+    (result,), verifier = verify(jwks_url, token, algorithms=["RS256"])
+    assert result is None
+    assert verifier.stats()["precheck_rejections"] == {"algorithm": 1}
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        make_token(signing_key=rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        make_token("ES256", kid="kid-RS256"),
+    ],
+)
+def test_failed_signature_is_negative_cached(jwks_url, token):
+    (result, replay), verifier = verify(jwks_url, token, token)
+    stats = verifier.stats()
+    assert result is None and replay is None
+    assert stats["full_verifications"] == 1
+    assert stats["rejected_tokens"] == {"entries": 1, "ttl": 60, "hits": 1, "recorded": 1}
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        make_token(nbf=int(time.time()) + 600),
+        make_token(iat=int(time.time()) + 600),
+        make_token(kid="rotated-in-later"),
+    ],
+)
+def test_tokens_that_may_pass_later_are_not_cached(jwks_url, token):
+    (result, retry), verifier = verify(jwks_url, token, token)
+    stats = verifier.stats()
+    assert result is None and retry is None
+    assert stats["full_verifications"] == 2
+    assert stats["rejected_tokens"]["recorded"] == 0
+
+
+def test_unreachable_jwks_is_not_the_tokens_fault():
+    jwks_client = AsyncJWKSClient("http://127.0.0.1:9/jwks.json", min_refetch_interval=0, timeout=1)
+    token = make_token()
+    (result, retry), verifier = verify(jwks_client.url, token, token, jwks_client=jwks_client)
+    stats = verifier.stats()
+    assert result is None and retry is None
+    assert stats["full_verifications"] == 2
+    assert stats["rejected_tokens"]["recorded"] == 0
+    assert stats["jwks"]["fetch_failures"] == 3
+
+
+def test_rejected_token_cache_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = RejectedTokenCache(ttl=60)
+    cache.add("token")
+    assert cache.contains("token")
+    now[0] += 60
+    assert not cache.contains("token")
+    assert cache.stats() == {"entries": 0, "ttl": 60, "hits": 1, "recorded": 1}
+
+
+def test_rejected_token_cache_evicts_oldest():
+    cache = RejectedTokenCache(max_entries=2)
+    for token in ("a", "b", "a", "c"):
+        cache.add(token)
+    # re-adding "a" refreshed it, so "b" was the oldest
+    assert [cache.contains(token) for token in ("a", "b", "c")] == [True, False, True]
+
+
+@pytest.mark.parametrize("options", [{"max_entries": 0}, {"ttl": 0}])
+def test_rejected_token_cache_disabled(options):
+    cache = RejectedTokenCache(**options)
+    cache.add("token")
+    assert not cache.contains("token")
+    assert cache.stats()["recorded"] == 0
+
+
+class BrokenPool:
+    """Stands in for a process pool whose worker was killed."""
+
+    active = queued = 0
+
+    def __init__(self):
+        self.shut_down = False
+
+    async def run(self, fn, *args):
+        raise BrokenProcessPool("a worker died")
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def test_broken_process_pool_is_replaced_by_threads():
+    private_key = KEYS["ES256"][0]
+    token = make_token("ES256")
+    header, payload, signature = token.split(".")
+    signing_input = f"{header}.{payload}".encode("ascii")
+    signature = base64.urlsafe_b64decode(signature + "==")
+
+    async def run():
+        offload = SignatureOffload(pool="process", auto_threshold=0)
+        broken = offload._executor = BrokenPool()
+        await offload.verify("kid-ES256", "ES256", private_key.public_key(), signature, signing_input)
+        assert broken.shut_down
+        assert offload.pool == "thread"
+        await offload.verify("kid-ES256", "ES256", private_key.public_key(), signature, signing_input)
+        assert isinstance(offload._executor._executor, ThreadPoolExecutor)
+        offload.shutdown()
+        return offload.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["overflow_inline"], stats["offloaded"], stats["rebuilds"]) == (1, 1, 1)
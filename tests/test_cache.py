@@ -0,0 +1,213 @@
+import asyncio
+import time
+
+import pytest
+
+from youtube_transcript_api import NoTranscriptFound, RequestBlocked, TranscriptsDisabled, VideoUnavailable
+
+from utils.cache import NegativeCache, Revalidator, TranscriptCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_eviction_stays_within_the_byte_budget():
+    cache = TranscriptCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # now "b" is the least recently used
+    cache.put("c", "cccc")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("aaaa", None, "cccc")
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = TranscriptCache(max_bytes=10)
+    cache.put("a", "aaaaaaaa")
+    cache.put("a", "aa")
+    assert cache.stats()["bytes"] == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_oversized_values_are_not_cached():
+    cache = TranscriptCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("a") == "aaaa"
+
+
+def test_size_counts_utf8_bytes():
+    cache = TranscriptCache()
+    cache.put("a", "héllo")
+    assert cache.stats()["bytes"] == 6
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TranscriptCache(ttl=60)
+    cache.put("key", "value")
+    clock[0] += 59
+    assert cache.get("key") == "value"
+    clock[0] += 1
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_discard_drops_every_format_of_a_video():
+    cache = TranscriptCache()
+    for key in [("v", "en", "segments"), ("v", "en", "text"), ("v", "de", "text"), ("w", "en", "text")]:
+        cache.put(key, "x")
+    cache.discard("v", "en")
+    assert [key for key in cache._entries] == [("v", "de", "text"), ("w", "en", "text")]
+
+
+def test_expired_entries_are_served_stale_then_dropped(clock):
+    cache = TranscriptCache(ttl=60, stale_ttl=30)
+    cache.put("key", "value")
+    assert cache.lookup("key") == ("value", False)
+    clock[0] += 60
+    assert cache.lookup("key") == ("value", True)
+    assert cache.get("key") is None
+    clock[0] += 30
+    assert cache.lookup("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_derived_entry_keeps_the_source_lifetime(clock):
+    cache = TranscriptCache(ttl=60, stale_ttl=30)
+    index = object()
+    cache.put(("v", "en", "segments"), index)
+    clock[0] += 50
+    cache.put_derived(("v", "en", "text"), "text", ("v", "en", "segments"), index)
+    clock[0] += 10
+    # rendered 10 s before the index expired, so it is stale with it
+    assert cache.lookup(("v", "en", "text")) == ("text", True)
+
+
+def test_text_rendered_from_a_stale_index_is_not_fresh(clock):
+    cache = TranscriptCache(ttl=60, stale_ttl=30)
+    index = object()
+    cache.put(("v", "en", "segments"), index)
+    clock[0] += 70
+    assert cache.lookup(("v", "en", "segments")) == (index, True)
+    cache.put_derived(("v", "en", "text"), "text", ("v", "en", "segments"), index)
+    assert cache.lookup(("v", "en", "text")) == ("text", True)
+
+
+def test_text_from_a_replaced_index_is_not_cached(clock):
+    cache = TranscriptCache(ttl=60, stale_ttl=30)
+    old_index = object()
+    cache.put(("v", "en", "segments"), old_index)
+    # a refresh lands while the old index is being rendered
+    cache.discard("v", "en")
+    cache.put(("v", "en", "segments"), object())
+    cache.put_derived(("v", "en", "text"), "old text", ("v", "en", "segments"), old_index)
+    assert cache.lookup(("v", "en", "text")) is None
+    cache.discard("v", "en")
+    cache.put_derived(("v", "en", "text"), "old text", ("v", "en", "segments"), old_index)
+    assert cache.lookup(("v", "en", "text")) is None
+
+
+def test_video_level_errors_cover_every_language(clock):
+    cache = NegativeCache(ttl=900)
+    cache.record("v", "en", TranscriptsDisabled("v"))
+    for language in ("en", "de"):
+        with pytest.raises(TranscriptsDisabled):
+            cache.check("v", language)
+    cache.check("w", "en")
+    assert cache.stats()["hits"] == 2
+
+
+def test_language_level_errors_cover_only_that_language(clock):
+    cache = NegativeCache(ttl=900)
+    cache.record("v", "de", NoTranscriptFound("v", ["de"], None))
+    with pytest.raises(NoTranscriptFound):
+        cache.check("v", "de")
+    cache.check("v", "en")
+
+
+def test_transient_errors_are_not_remembered(clock):
+    cache = NegativeCache(ttl=900)
+    for error in (RequestBlocked("v"), TimeoutError(), RuntimeError("boom")):
+        cache.record("v", "en", error)
+    cache.check("v", "en")
+    assert cache.stats()["recorded"] == 0
+
+
+def test_negative_entries_expire(clock):
+    cache = NegativeCache(ttl=900)
+    cache.record("v", "en", VideoUnavailable("v"))
+    clock[0] += 900
+    cache.check("v", "en")
+    assert cache.stats()["entries"] == 0
+
+
+def test_negative_cache_is_bounded_and_can_be_disabled(clock):
+    cache = NegativeCache(max_entries=2)
+    for video_id in ("a", "b", "c"):
+        cache.record(video_id, "en", VideoUnavailable(video_id))
+    cache.check("a", "en")
+    with pytest.raises(VideoUnavailable):
+        cache.check("c", "en")
+
+    disabled = NegativeCache(ttl=0)
+    disabled.record("v", "en", VideoUnavailable("v"))
+    disabled.check("v", "en")
+
+
+def test_repeated_raises_do_not_grow_the_traceback(clock):
+    cache = NegativeCache()
+    cache.record("v", "en", VideoUnavailable("v"))
+    depths = []
+    for _ in range(3):
+        try:
+            cache.check("v", "en")
+        except VideoUnavailable as e:
+            depth, tb = 0, e.__traceback__
+            while tb is not None:
+                depth, tb = depth + 1, tb.tb_next
+            depths.append(depth)
+    assert depths[0] == depths[-1]
+
+
+def test_revalidator_runs_one_refresh_per_key():
+    calls = []
+
+    async def refresh(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+
+    async def run():
+        revalidator = Revalidator()
+        revalidator.refresh("a", refresh, "first")
+        revalidator.refresh("a", refresh, "second")
+        revalidator.refresh("b", refresh, "other")
+        assert revalidator.stats()["in_flight"] == 2
+        await asyncio.sleep(0.05)
+        revalidator.refresh("a", refresh, "again")
+        await asyncio.sleep(0.05)
+        return revalidator.stats()
+
+    stats = asyncio.run(run())
+    assert calls == ["first", "other", "again"]
+    assert stats == {"in_flight": 0, "started": 3, "deduplicated": 1, "succeeded": 3, "failed": 0}
+
+
+def test_revalidator_counts_failures():
+    async def refresh():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        revalidator = Revalidator()
+        revalidator.refresh("a", refresh)
+        await asyncio.sleep(0.01)
+        return revalidator.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["in_flight"], stats["failed"], stats["succeeded"]) == (0, 1, 0)
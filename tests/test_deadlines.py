@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.deadlines import client_timeout, deadline, tool_deadline
+
+
+def make_ctx(timeout=None, meta=True):
+    meta = SimpleNamespace(timeout=timeout) if meta else None
+    return SimpleNamespace(request_context=SimpleNamespace(meta=meta))
+
+
+class NoRequest:
+    @property
+    def request_context(self):
+        raise ValueError("Context is not available outside of a request")
+
+
+@pytest.mark.parametrize(
+    "ctx, expected",
+    [
+        (make_ctx(12), 12.0),
+        (make_ctx("7.5"), 7.5),
+        (make_ctx(None), None),
+        (make_ctx("soon"), None),
+        (make_ctx(meta=False), None),
+        (NoRequest(), None),
+        (object(), None),
+    ],
+)
+def test_client_timeout(ctx, expected):
+    assert client_timeout(ctx) == expected
+
+
+def test_tool_deadline_from_environment(monkeypatch):
+    monkeypatch.delenv("TOOL_DEADLINE_SECONDS", raising=False)
+    monkeypatch.delenv("DEADLINE_FETCH_VIDEO_TRANSCRIPT", raising=False)
+    assert tool_deadline("fetch_video_transcript") == 60
+    monkeypatch.setenv("TOOL_DEADLINE_SECONDS", "30")
+    assert tool_deadline("fetch_video_transcript") == 30
+    monkeypatch.setenv("DEADLINE_FETCH_VIDEO_TRANSCRIPT", "90")
+    assert tool_deadline("fetch_video_transcript") == 90
+    assert tool_deadline("fetch_video_transcripts") == 30
+
+
+def test_tool_deadline_is_capped_by_the_client(monkeypatch):
+    monkeypatch.setenv("TOOL_DEADLINE_SECONDS", "30")
+    assert tool_deadline("t", make_ctx(10)) == 9.5
+    assert tool_deadline("t", make_ctx(100)) == 30
+    assert tool_deadline("t", make_ctx(0.2)) == 0.1
+    assert tool_deadline("t", NoRequest()) == 30
+
+
+def test_deadline_cancels_the_work_and_names_it():
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        async with deadline(0.01, "fetch_video_transcript"):
+            await work()
+
+    with pytest.raises(TimeoutError, match=r"fetch_video_transcript did not finish within 0\.0s"):
+        asyncio.run(run())
+    assert cancelled == [True]
+
+
+def test_deadline_lets_fast_work_finish():
+    async def run():
+        async with deadline(1, "quick"):
+            return await asyncio.sleep(0, "done")
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from utils.executor import BoundedExecutor, FetchQueueFull
+
+
+def test_async_calls_start_no_threads():
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    async def run():
+        executor = BoundedExecutor(max_workers=2)
+        results = await asyncio.gather(*(executor.run_async(fetch, i) for i in range(4)))
+        return results, executor
+
+    results, executor = asyncio.run(run())
+    assert results == [0, 1, 2, 3]
+    assert executor._executor is None
+    assert executor.stats()["completed"] == 4
+    executor.shutdown()
+
+
+def test_blocking_calls_run_on_a_pool():
+    async def run():
+        executor = BoundedExecutor(max_workers=1)
+        try:
+            return await executor.run(sum, [1, 2, 3]), executor._executor is not None
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(run()) == (6, True)
+
+
+def test_full_queue_rejects():
+    async def run():
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(executor.run_async(release.wait))
+        waiting = asyncio.create_task(executor.run_async(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(FetchQueueFull):
+            await executor.run_async(release.wait)
+        release.set()
+        await asyncio.gather(running, waiting)
+        return executor.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["completed"], stats["rejected"], stats["max_queue_seen"]) == (2, 1, 1)
@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from utils.formatting import (
+    FORMATS,
+    format_cue_time,
+    format_timestamp,
+    get_format,
+    iter_transcript_chunks,
+    merge_segments,
+    render_transcript,
+    savings_note,
+    structured_segments,
+)
+from utils.transcript_index import TranscriptIndex
+
+TEXTS = ["So today", "we're looking at caches.", "They are fast", "until they aren't!", "Let's see why."]
+
+
+def make_index() -> TranscriptIndex:
+    return TranscriptIndex.from_columns([i * 4.0 for i in range(len(TEXTS))], [3.5] * len(TEXTS), TEXTS)
+
+
+@pytest.mark.parametrize("format", FORMATS)
+@pytest.mark.parametrize("chunk_chars", [1, 20, 10_000])
+def test_joined_stream_chunks_equal_the_full_render(format, chunk_chars):
+    index = make_index()
+    separator = FORMATS[format].separator
+    chunks = list(iter_transcript_chunks(index, chunk_chars, format))
+    assert separator.join(chunk for _, chunk in chunks) == render_transcript(index, format)
+    assert chunks[-1][0] == len(index)
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_stream_of_an_empty_transcript(format):
+    empty = TranscriptIndex()
+    assert "".join(chunk for _, chunk in iter_transcript_chunks(empty, 100, format)) == render_transcript(empty, format)
+
+
+def test_timestamps():
+    assert format_timestamp(75.9) == "[01:15]"
+    assert format_timestamp(3725) == "[1:02:05]"
+    assert format_cue_time(3725.5, ",") == "01:02:05,500"
+    assert format_cue_time(0.0015, ".") == "00:00:00.002"
+
+
+def test_text_and_plain():
+    index = make_index()[:2]
+    assert render_transcript(index, "text") == "[00:00] So today\n[00:04] we're looking at caches."
+    assert render_transcript(index, "plain") == "So today\nwe're looking at caches."
+
+
+def test_srt_and_vtt_cues():
+    index = make_index()[:2]
+    assert render_transcript(index, "srt") == (
+        "1\n00:00:00,000 --> 00:00:03,500\nSo today\n\n"
+        "2\n00:00:04,000 --> 00:00:07,500\nwe're looking at caches.\n"
+    )
+    assert render_transcript(index, "vtt") == (
+        "WEBVTT\n\n00:00:00.000 --> 00:00:03.500\nSo today\n\n"
+        "00:00:04.000 --> 00:00:07.500\nwe're looking at caches.\n"
+    )
+
+
+def test_json_is_a_valid_segment_list():
+    index = TranscriptIndex.from_columns([0.0], [1.5], ['Caf\u00e9 "quoted"'])
+    assert json.loads(render_transcript(index, "json")) == [{"start": 0.0, "duration": 1.5, "text": 'Caf\u00e9 "quoted"'}]
+
+
+def test_structured_segments_are_columns():
+    index = make_index()
+    assert structured_segments(index) == {
+        "starts": [0.0, 4.0, 8.0, 12.0, 16.0],
+        "durations": [3.5] * 5,
+        "texts": TEXTS,
+    }
+    assert structured_segments(iter(index)) == structured_segments(index)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown format"):
+        get_format("docx")
+
+
+def test_sentence_granularity_merges_until_sentence_ends():
+    segments, _ = merge_segments(make_index(), "sentence")
+    assert list(segments.texts()) == ["So today we're looking at caches.", "They are fast until they aren't!", "Let's see why."]
+    assert list(segments.starts) == [0.0, 8.0, 16.0]
+    assert list(segments.durations) == [7.5, 7.5, 3.5]
+
+
+def test_timestamp_granularity_buckets_by_interval():
+    segments, _ = merge_segments(make_index(), "timestamp", interval=10)
+    assert list(segments.starts) == [0.0, 12.0]
+    assert list(segments.texts())[1] == "until they aren't! Let's see why."
+
+
+def test_paragraph_granularity_waits_for_a_sentence_end():
+    segments, _ = merge_segments(make_index(), "paragraph", interval=5)
+    assert list(segments.texts()) == ["So today we're looking at caches.", "They are fast until they aren't!", "Let's see why."]
+
+
+def test_long_silence_starts_a_new_segment():
+    # "So today" then nothing for two minutes: the next words must not carry the 0:00 timestamp
+    index = TranscriptIndex.from_columns([0.0, 120.0, 124.0], [3.5] * 3, ["So today", "we're back.", "Right?"])
+    sentence, _ = merge_segments(index, "sentence")
+    assert list(sentence.starts) == [0.0, 120.0, 124.0]
+    assert list(sentence.texts()) == ["So today", "we're back.", "Right?"]
+    paragraph, _ = merge_segments(index, "paragraph", interval=30)
+    assert list(paragraph.starts) == [0.0, 120.0]
+    assert list(paragraph.durations) == [3.5, 7.5]
+
+
+def test_paragraph_closes_at_a_sentence_end_before_a_pause():
+    index = TranscriptIndex.from_columns([0.0, 4.0, 40.0], [3.5] * 3, ["Caches are fast.", "Mostly.", "Now, why?"])
+    segments, _ = merge_segments(index, "paragraph", interval=30)
+    assert list(segments.texts()) == ["Caches are fast. Mostly.", "Now, why?"]
+    assert list(segments.starts) == [0.0, 40.0]
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_raw_chars_is_the_unmerged_length_in_the_same_format(format):
+    index = make_index()
+    _, raw_chars = merge_segments(index, "paragraph", format=format)
+    assert raw_chars == len(render_transcript(index, format))
+
+
+def test_raw_granularity_leaves_segments_alone():
+    index = make_index()
+    segments, raw_chars = merge_segments(index, "raw")
+    assert segments is index
+    assert raw_chars == 0
+
+
+def test_unknown_granularity():
+    with pytest.raises(ValueError, match="Unknown granularity"):
+        merge_segments(make_index(), "chapter")
+
+
+def test_savings_note():
+    assert savings_note("sentence", 1000, 600) == (
+        "[granularity=sentence: 600 characters instead of 1,000 (40% fewer, ~100 tokens saved)]"
+    )
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from utils.hedging import HedgePolicy
+
+
+def attempt(delay: float, result=None, error: Exception | None = None):
+    async def run():
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return run
+
+
+def test_fast_primary_is_not_hedged():
+    policy = HedgePolicy(enabled=True, initial_delay=0.5)
+    assert asyncio.run(policy.run(attempt(0, "primary"), attempt(0, "hedge"))) == "primary"
+    assert (policy.requests, policy.hedged, policy.hedge_wins) == (1, 0, 0)
+    assert len(policy._latencies) == 1
+
+
+def test_slow_primary_loses_to_the_hedge():
+    policy = HedgePolicy(enabled=True, initial_delay=0.05)
+
+    async def run():
+        result = await policy.run(attempt(1, "primary"), attempt(0, "hedge"))
+        await asyncio.sleep(0)  # let the cancelled primary finish
+        return result
+
+    assert asyncio.run(run()) == "hedge"
+    assert (policy.hedged, policy.hedge_wins) == (1, 1)
+    # the hedge's latency and the lost primary's time so far (at least the hedge delay)
+    hedge_latency, primary_elapsed = sorted(policy._latencies)
+    assert primary_elapsed >= 0.05 > hedge_latency
+
+
+def test_primary_cancelled_by_the_caller_is_recorded():
+    policy = HedgePolicy(enabled=True, initial_delay=5)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(policy.run(attempt(1), attempt(0)), 0.05)
+
+    asyncio.run(run())
+    assert policy.hedged == 0
+    (elapsed,) = policy._latencies
+    assert elapsed >= 0.05
+
+
+def test_primary_wins_when_the_hedge_fails():
+    policy = HedgePolicy(enabled=True, initial_delay=0.01)
+    result = asyncio.run(policy.run(attempt(0.05, "primary"), attempt(0, error=RuntimeError("hedge"))))
+    assert result == "primary"
+    assert (policy.hedged, policy.hedge_wins) == (1, 0)
+
+
+def test_both_failing_raises_the_primarys_error():
+    policy = HedgePolicy(enabled=True, initial_delay=0.01)
+    with pytest.raises(ValueError, match="primary"):
+        asyncio.run(policy.run(attempt(0.05, error=ValueError("primary")), attempt(0, error=RuntimeError("hedge"))))
+    assert len(policy._latencies) == 0
+
+
+def test_delay_is_a_clamped_percentile():
+    policy = HedgePolicy(percentile=90, initial_delay=2, min_delay=0.5, max_delay=10, min_samples=10)
+    assert policy.delay() == 2
+    for i in range(1, 11):
+        policy.record(i * 0.1)
+    assert policy.delay() == 1.0
+    for _ in range(100):
+        policy.record(60)
+    assert policy.delay() == 10
+
+
+def test_delay_floor():
+    policy = HedgePolicy(min_samples=1, min_delay=0.5)
+    policy.record(0.001)
+    assert policy.delay() == 0.5
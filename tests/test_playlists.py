@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from utils.playlists import PlaylistResolveError, listing_path, resolve_video_ids
+
+
+def video(video_id: str) -> dict:
+    return {"playlistVideoRenderer": {"videoId": video_id}}
+
+
+def continuation(token: str) -> dict:
+    return {"continuationItemRenderer": {"continuationEndpoint": {"continuationCommand": {"token": token}}}}
+
+
+# First page repeats a video; the continuation pages overlap with what came before
+FIRST_PAGE = {"contents": [video("a"), video("b"), video("a"), continuation("page-2")]}
+CONTINUATIONS = {
+    "page-2": {"onResponseReceivedActions": [video("b"), video("c"), continuation("page-3")]},
+    "page-3": {"onResponseReceivedActions": [video("d")]},
+}
+
+
+def listing_html(data: dict) -> str:
+    return (
+        '<html><script>ytcfg.set({"INNERTUBE_API_KEY": "test-key"});</script>'
+        f"<script>var ytInitialData = {json.dumps(data)};</script></html>"
+    )
+
+
+@pytest.fixture
+def youtube():
+    """Local stand-in for the listing page and browse API; records the paths it served."""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status: int, body: str, content_type: str) -> None:
+            encoded = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def do_GET(self):
+            requests.append(self.path)
+            if self.path in ("/playlist?list=PL123", "/@someone/videos"):
+                self.reply(200, listing_html(FIRST_PAGE), "text/html")
+            else:
+                self.reply(404, "not found", "text/plain")
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests.append((self.path, body["continuation"]))
+            self.reply(200, json.dumps(CONTINUATIONS[body["continuation"]]), "application/json")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    finally:
+        server.shutdown()
+
+
+def resolve(base_url: str, url: str, max_videos: int = 200) -> list[str]:
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await resolve_video_ids(client, url, max_videos, base_url)
+
+    return asyncio.run(run())
+
+
+def test_listing_path():
+    assert listing_path("https://www.youtube.com/playlist?list=PL123") == "/playlist?list=PL123"
+    assert listing_path("https://www.youtube.com/watch?v=x&list=PL123") == "/playlist?list=PL123"
+    assert listing_path("https://www.youtube.com/@someone/shorts") == "/@someone/videos"
+    with pytest.raises(ValueError):
+        listing_path("https://www.youtube.com/watch?v=x")
+
+
+def test_follows_continuations_and_dedupes(youtube):
+    base_url, requests = youtube
+    assert resolve(base_url, "https://www.youtube.com/playlist?list=PL123") == ["a", "b", "c", "d"]
+    assert requests == [
+        "/playlist?list=PL123",
+        ("/youtubei/v1/browse?key=test-key", "page-2"),
+        ("/youtubei/v1/browse?key=test-key", "page-3"),
+    ]
+
+
+def test_stops_paging_at_max_videos(youtube):
+    base_url, requests = youtube
+    assert resolve(base_url, "https://www.youtube.com/@someone", max_videos=2) == ["a", "b"]
+    assert requests == ["/@someone/videos"]
+
+
+def test_listing_errors(youtube):
+    base_url, _ = youtube
+    with pytest.raises(PlaylistResolveError, match="HTTP 404"):
+        resolve(base_url, "https://www.youtube.com/playlist?list=missing")
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from utils.ratelimit import RateLimited, TokenBucket
+
+
+def test_burst_is_served_immediately_then_callers_wait():
+    async def run():
+        bucket = TokenBucket(rate=100, burst=3)
+        return [await bucket.acquire() for _ in range(4)], bucket.stats()
+
+    waits, stats = asyncio.run(run())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0 < waits[3] <= 0.011
+    assert stats["acquired"] == 4
+
+
+def test_waiters_are_spaced_by_the_rate():
+    async def run():
+        bucket = TokenBucket(rate=100, burst=1)
+        return await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+
+    waits = asyncio.run(run())
+    assert waits[0] == 0.0
+    assert waits[1] < waits[2] < waits[3]
+    assert waits[3] == pytest.approx(0.03, abs=0.005)
+
+
+def test_rejects_when_the_wait_would_exceed_max_wait():
+    async def run():
+        bucket = TokenBucket(rate=1, burst=1, max_wait=0.5)
+        await bucket.acquire()
+        with pytest.raises(RateLimited) as raised:
+            await bucket.acquire()
+        return raised.value, bucket.stats()
+
+    error, stats = asyncio.run(run())
+    assert error.retry_after == pytest.approx(1.0, abs=0.05)
+    assert stats["rejected"] == 1
+
+
+def test_cancelled_waiter_returns_its_token():
+    async def run():
+        bucket = TokenBucket(rate=10, burst=1)
+        await bucket.acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        # The cancelled reservation is handed back, so the next caller waits one interval, not two
+        return await bucket.acquire(), bucket.stats()
+
+    wait, stats = asyncio.run(run())
+    assert wait <= 0.1
+    assert stats["waiting"] == 0
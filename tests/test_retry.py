@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+from youtube_transcript_api import RequestBlocked, TranscriptsDisabled, YouTubeRequestFailed
+
+from utils.proxies import NoHealthyProxy, ProxyPool
+from utils.retry import RetryPolicy, is_retryable, upstream_status
+
+
+def upstream_error(status: int) -> YouTubeRequestFailed:
+    request = httpx.Request("GET", "https://www.youtube.com/watch?v=abc")
+    try:
+        httpx.Response(status, request=request).raise_for_status()
+    except httpx.HTTPStatusError as error:
+        return YouTubeRequestFailed("abc", error)
+
+
+def flaky(*outcomes):
+    """Async callable that raises or returns each outcome in turn; counts its calls."""
+    remaining = list(outcomes)
+
+    async def call():
+        call.calls += 1
+        outcome = remaining.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    call.calls = 0
+    return call
+
+
+def fast_policy(**options) -> RetryPolicy:
+    return RetryPolicy(base_delay=0.001, max_delay=0.001, **options)
+
+
+def test_upstream_status():
+    assert upstream_status(upstream_error(503)) == 503
+    assert upstream_status(upstream_error(404)) == 404
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (RequestBlocked("abc"), True),
+        (upstream_error(429), True),
+        (upstream_error(503), True),
+        (upstream_error(404), False),
+        (httpx.ReadTimeout("slow"), True),
+        (TranscriptsDisabled("abc"), False),
+        (ValueError("bug"), False),
+    ],
+)
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_recovers_after_transient_failures():
+    policy = fast_policy()
+    call = flaky(upstream_error(503), httpx.ConnectError("reset"), "ok")
+    assert asyncio.run(policy.run(call)) == "ok"
+    assert call.calls == 3
+    assert policy.stats()["recovered"] == 1
+
+
+def test_terminal_errors_are_not_retried():
+    policy = fast_policy()
+    call = flaky(TranscriptsDisabled("abc"))
+    with pytest.raises(TranscriptsDisabled):
+        asyncio.run(policy.run(call))
+    assert call.calls == 1
+    assert policy.terminal == 1
+
+
+def test_gives_up_after_max_attempts():
+    policy = fast_policy(max_attempts=2)
+    call = flaky(upstream_error(503), upstream_error(502), "never")
+    with pytest.raises(YouTubeRequestFailed):
+        asyncio.run(policy.run(call))
+    assert call.calls == 2
+    assert policy.exhausted == 1
+
+
+def test_gives_up_when_the_backoff_would_pass_the_deadline():
+    policy = RetryPolicy(base_delay=10, max_delay=10, deadline=0.001)
+    policy.backoff = lambda attempt: 10
+    call = flaky(upstream_error(503), "never")
+    with pytest.raises(YouTubeRequestFailed):
+        asyncio.run(policy.run(call))
+    assert call.calls == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    assert all(0 <= policy.backoff(attempt) <= min(4, 2 ** (attempt - 1)) for attempt in range(1, 8) for _ in range(20))
+
+
+def test_unavailable_retry_surfaces_the_original_error():
+    policy = fast_policy(unavailable=(NoHealthyProxy,))
+    blocked = RequestBlocked("abc")
+    call = flaky(blocked, NoHealthyProxy("none left"))
+    with pytest.raises(RequestBlocked) as raised:
+        asyncio.run(policy.run(call))
+    assert raised.value is blocked
+
+
+def test_blocks_are_only_retried_with_another_proxy_available():
+    single = ProxyPool(["http://proxy0.example:8080"])
+    assert not single.worth_retrying(RequestBlocked("abc"))
+    assert single.worth_retrying(upstream_error(503))
+
+    pair = ProxyPool(["http://proxy0.example:8080", "http://proxy1.example:8080"])
+    assert pair.worth_retrying(RequestBlocked("abc"))
+    for endpoint in pair.endpoints:
+        pair.trip(endpoint)
+    assert not pair.worth_retrying(RequestBlocked("abc"))
+
+    policy = fast_policy(retryable=single.worth_retrying)
+    call = flaky(RequestBlocked("abc"), "never")
+    with pytest.raises(RequestBlocked):
+        asyncio.run(policy.run(call))
+    assert call.calls == 1
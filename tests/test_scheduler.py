@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+
+from utils.scheduler import ClientThrottled, FairScheduler
+
+
+def test_light_client_is_not_starved_by_a_backlog():
+    async def run():
+        scheduler = FairScheduler(slots=1, max_per_client=1, quota_requests=0)
+        order = []
+        release = asyncio.Event()
+
+        async def job(client_id, name):
+            async with scheduler.slot(client_id):
+                order.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(job("heavy", f"heavy-{i}")) for i in range(6)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(job("light", "light-0")))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(run())
+    # heavy-0 already held the slot; light's tag ties heavy-1's, and heavy-1 was queued first
+    assert order.index("light-0") == 2
+
+
+def test_weights_share_slots_proportionally():
+    async def run():
+        scheduler = FairScheduler(slots=1, max_per_client=1, quota_requests=0, weights={"gold": 3})
+        order = []
+
+        async def job(client_id):
+            async with scheduler.slot(client_id):
+                order.append(client_id)
+                await asyncio.sleep(0)
+
+        tasks = [asyncio.create_task(job(client_id)) for client_id in ["gold"] * 6 + ["basic"] * 6]
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(run())
+    assert order[:8].count("gold") == 6
+
+
+def test_per_client_concurrency_cap():
+    async def run():
+        scheduler = FairScheduler(slots=4, max_per_client=2, quota_requests=0)
+        peak = 0
+        running = 0
+
+        async def job():
+            nonlocal peak, running
+            async with scheduler.slot("client"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+        return peak, scheduler.stats()
+
+    peak, stats = asyncio.run(run())
+    assert peak == 2
+    assert stats["in_use"] == 0
+    assert stats["granted"] == 6
+
+
+def test_quota_throttles_only_the_client_over_it():
+    scheduler = FairScheduler(quota_requests=2, quota_window=60)
+    scheduler.check_quota("busy")
+    scheduler.check_quota("busy")
+    with pytest.raises(ClientThrottled) as raised:
+        scheduler.check_quota("busy")
+    assert raised.value.client_id == "busy"
+    assert 0 < raised.value.retry_after <= 60
+    scheduler.check_quota("quiet")
+    assert scheduler.stats()["throttled"] == 1
+
+
+def test_joined_request_is_granted_on_the_first_tag():
+    async def run():
+        scheduler = FairScheduler(slots=1, max_per_client=1, quota_requests=0)
+        order = []
+        release = asyncio.Event()
+
+        async def job(client_id, key=None):
+            async with scheduler.slot(client_id, key) as charged:
+                order.append((key, charged))
+                await release.wait()
+
+        tasks = [asyncio.create_task(job("a", f"a-{i}")) for i in range(3)]
+        tasks.append(asyncio.create_task(job("a", "shared")))
+        await asyncio.sleep(0)
+        scheduler.join("shared", "b")
+        stats = scheduler.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return order, stats
+
+    order, stats = asyncio.run(run())
+    # b's first tag ties a-1's (queued earlier) and beats the rest of a's backlog
+    assert order[2] == ("shared", "b")
+    assert stats["joined"] == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def run():
+        scheduler = FairScheduler(slots=1, max_per_client=1, quota_requests=0)
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("a"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["in_use"] == 0
+    assert stats["queued"] == 0
+
+
+def test_stats_do_not_expose_client_ids():
+    async def run():
+        scheduler = FairScheduler(quota_requests=1)
+        async with scheduler.slot("secret-client"):
+            stats = scheduler.stats()
+        with pytest.raises(ClientThrottled):
+            scheduler.check_quota("secret-client")
+            scheduler.check_quota("secret-client")
+        return stats, scheduler.stats()
+
+    during, after = asyncio.run(run())
+    assert during["active_clients"] == 1
+    assert "secret-client" not in repr(during) + repr(after)
+
+
+def test_quota_is_charged_when_a_slot_is_taken():
+    async def run():
+        scheduler = FairScheduler(quota_requests=1, quota_window=60)
+        async with scheduler.slot("client"):
+            pass
+        with pytest.raises(ClientThrottled):
+            async with scheduler.slot("client"):
+                pass
+        # Uncharged work (e.g. background refreshes) still gets a slot
+        async with scheduler.slot("client", charge=False):
+            pass
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["granted"] == 2
+    assert stats["throttled"] == 1
+
+
+def test_throttled_leader_is_covered_by_another_interested_client():
+    async def run():
+        scheduler = FairScheduler(quota_requests=1, quota_window=60)
+        scheduler.check_quota("leader")
+        with scheduler.interest("video", "leader"), scheduler.interest("video", "joiner"):
+            async with scheduler.slot("leader", key="video"):
+                pass
+        with pytest.raises(ClientThrottled) as raised:
+            scheduler.check_quota("joiner")
+        return raised.value
+
+    error = asyncio.run(run())
+    assert "joiner" not in str(error)
+
+
+def test_everyone_interested_out_of_quota_is_throttled():
+    async def run():
+        scheduler = FairScheduler(quota_requests=1, quota_window=60)
+        for client_id in ("leader", "joiner"):
+            scheduler.check_quota(client_id)
+        with scheduler.interest("video", "leader"), scheduler.interest("video", "joiner"):
+            async with scheduler.slot("leader", key="video"):
+                pass
+
+    with pytest.raises(ClientThrottled, match="Request quota exceeded"):
+        asyncio.run(run())
+
+
+def test_interested_clients_are_queued_for_the_shared_request():
+    async def run():
+        scheduler = FairScheduler(slots=1, max_per_client=1, quota_requests=0)
+        order = []
+        release = asyncio.Event()
+
+        async def job(client_id, key):
+            async with scheduler.slot(client_id, key) as charged:
+                order.append((key, charged))
+                await release.wait()
+
+        tasks = [asyncio.create_task(job("a", f"a-{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        with scheduler.interest("shared", "b"):
+            tasks.append(asyncio.create_task(job("a", "shared")))
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*tasks)
+        return order, scheduler._interested
+
+    order, interested = asyncio.run(run())
+    assert order[2] == ("shared", "b")
+    assert interested == {}
+
+
+def test_prepaid_batch_is_charged_once():
+    async def run():
+        scheduler = FairScheduler(quota_requests=2, quota_window=60)
+        with scheduler.prepaid("client"):
+            for _ in range(5):
+                async with scheduler.slot("client"):
+                    pass
+        scheduler.check_quota("client")
+        with pytest.raises(ClientThrottled):
+            scheduler.check_quota("client")
+
+    asyncio.run(run())
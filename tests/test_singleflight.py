@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+
+        async def fetch(value):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(*(flights.do("key", fetch, 42) for _ in range(5)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(run())
+    assert results == [42] * 5
+    assert calls == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+    async def run():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        return await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_one_caller_cancelling_leaves_the_call_running():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flights.do("key", fetch))
+        second = asyncio.create_task(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, flights.stats()
+
+    result, stats = asyncio.run(run())
+    assert result == "done"
+    assert stats["abandoned"] == 0
+
+
+def test_last_caller_cancelling_cancels_the_call():
+    async def run():
+        flights = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.do("key", fetch)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        # A new call for the key starts fresh instead of joining the cancelled one
+        async def fresh():
+            return "fresh"
+
+        return cancelled.is_set(), await flights.do("key", fresh), flights.stats()
+
+    was_cancelled, result, stats = asyncio.run(run())
+    assert was_cancelled
+    assert result == "fresh"
+    assert stats["abandoned"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+import time
+
+from youtube_transcript_api import FetchedTranscript, FetchedTranscriptSnippet
+
+from utils.store import TranscriptStore, decode_segments, encode_segments
+
+
+def make_transcript(video_id: str = "dQw4w9WgXcQ", texts=("Never gonna", "give you up")) -> FetchedTranscript:
+    return FetchedTranscript(
+        snippets=[FetchedTranscriptSnippet(text=text, start=i * 2.5, duration=2.5) for i, text in enumerate(texts)],
+        video_id=video_id,
+        language="English",
+        language_code="en",
+        is_generated=True,
+    )
+
+
+def test_segments_round_trip():
+    transcript = make_transcript(texts=("héllo", "", "wörld ♪"))
+    assert decode_segments(encode_segments(transcript)) == list(transcript)
+
+
+def test_put_get_and_survive_a_restart(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+
+    async def write():
+        store = TranscriptStore(path)
+        assert await store.get("dQw4w9WgXcQ", "en") is None
+        await store.put(make_transcript(), "en")
+        await store.put(make_transcript(texts=("Nunca",)), "es")
+        await store.put(make_transcript(texts=("Never", "gonna")), "en")  # replaces the first
+        stats = store.stats()
+        store.close()
+        return stats
+
+    stats = asyncio.run(write())
+    assert (stats["rows"], stats["writes"], stats["misses"]) == (2, 3, 1)
+
+    async def read():
+        store = TranscriptStore(path)
+        try:
+            return await store.get("dQw4w9WgXcQ", "en"), await store.get("dQw4w9WgXcQ", "de"), store.stats()
+        finally:
+            store.close()
+
+    transcript, missing, stats = asyncio.run(read())
+    assert [entry.text for entry in transcript] == ["Never", "gonna"]
+    assert (transcript.video_id, transcript.language, transcript.language_code) == ("dQw4w9WgXcQ", "English", "en")
+    assert transcript.is_generated
+    assert missing is None
+    assert (stats["rows"], stats["hits"], stats["misses"]) == (2, 1, 1)
+
+
+def test_rows_older_than_max_age_are_misses(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+
+    async def run():
+        store = TranscriptStore(path, max_age=3600)
+        try:
+            await store.put(make_transcript(), "en")
+            fresh = await store.get("dQw4w9WgXcQ", "en")
+            with sqlite3.connect(path) as conn:
+                conn.execute("UPDATE transcripts SET fetched_at = ?", (time.time() - 3600,))
+            return fresh, await store.get("dQw4w9WgXcQ", "en")
+        finally:
+            store.close()
+
+    fresh, expired = asyncio.run(run())
+    assert fresh is not None
+    assert expired is None
+
+
+def test_schema_drops_the_redundant_index(tmp_path):
+    path = str(tmp_path / "transcripts.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE transcripts (video_id TEXT NOT NULL, language TEXT NOT NULL, "
+            "language_name TEXT NOT NULL, is_generated INTEGER NOT NULL, fetched_at REAL NOT NULL, "
+            "segment_count INTEGER NOT NULL, segments BLOB NOT NULL, PRIMARY KEY (video_id, language))"
+        )
+        conn.execute("CREATE INDEX idx_transcripts_video_id ON transcripts (video_id)")
+    store = TranscriptStore(path)
+    indexes = {name for (name,) in store._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    store.close()
+    assert "idx_transcripts_video_id" not in indexes
+    assert {"idx_transcripts_language", "idx_transcripts_fetched_at"} <= indexes
@@ -0,0 +1,62 @@
+from utils.transcript_index import Segment, TranscriptIndex
+
+TEXTS = ["Hello there", "general Kenobi", "you are a bold one", "Élan vital", "ÉCOLE", "goodbye"]
+
+
+def make_index() -> TranscriptIndex:
+    return TranscriptIndex.from_columns([i * 10.0 for i in range(len(TEXTS))], [9.0] * len(TEXTS), TEXTS)
+
+
+def test_round_trips_segments():
+    index = make_index()
+    assert len(index) == len(TEXTS)
+    assert list(index.texts()) == TEXTS
+    assert index[1] == Segment(10.0, 9.0, "general Kenobi")
+    assert index[-1].text == "goodbye"
+    assert list(index[2:4].texts()) == TEXTS[2:4]
+
+
+def test_window_by_time_range():
+    index = make_index()
+    # 15s falls inside the segment that started at 10s
+    segments, cursor = index.window(start_time=15, end_time=30)
+    assert list(segments.starts) == [10.0, 20.0, 30.0]
+    assert cursor is None
+
+
+def test_window_pages_with_cursor_and_max_chars():
+    index = make_index()
+    pages = []
+    cursor = 0
+    while cursor is not None:
+        segments, cursor = index.window(cursor=cursor, max_chars=40)
+        assert len(segments) >= 1
+        pages.append(list(segments.texts()))
+    assert len(pages) > 1
+    assert [text for page in pages for text in page] == TEXTS
+
+
+def test_window_always_returns_an_oversized_segment():
+    index = make_index()
+    segments, cursor = index.window(cursor=2, max_chars=1)
+    assert list(segments.texts()) == ["you are a bold one"]
+    assert cursor == 3
+
+
+def test_search_is_case_insensitive():
+    index = make_index()
+    assert index.search("KENOBI") == [1]
+    assert index.search("o") == [0, 1, 2, 4, 5]
+    assert index.search("o", max_results=2) == [0, 1]
+    assert index.search("") == []
+
+
+def test_search_folds_non_ascii_case():
+    index = make_index()
+    assert index.search("élan") == [3]
+    assert index.search("école") == [4]
+
+
+def test_search_ignores_matches_across_segments():
+    index = TranscriptIndex.from_columns([0, 1, 2], [1, 1, 1], ["hello wor", "ld", "world"])
+    assert index.search("world") == [2]
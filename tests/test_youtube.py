@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from youtube_transcript_api import (
+    AgeRestricted,
+    FailedToCreateConsentCookie,
+    IpBlocked,
+    NoTranscriptFound,
+    PoTokenRequired,
+    RequestBlocked,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    YouTubeDataUnparsable,
+    YouTubeRequestFailed,
+)
+
+from utils.youtube import BOT_DETECTED_REASON, AsyncTranscriptClient
+
+WATCH_HTML = '<html><script>ytcfg.set({"INNERTUBE_API_KEY": "test-key"});</script></html>'
+CONSENT_HTML = '<form action="https://consent.youtube.com/s"><input name="v" value="cb.123"></form>'
+CAPTIONS_XML = (
+    '<?xml version="1.0" encoding="utf-8" ?><transcript>'
+    '<text start="0.5" dur="2.25">Hello &amp;amp; &lt;i&gt;welcome&lt;/i&gt;</text>'
+    '<text start="2.75">no duration</text>'
+    '<text start="4" dur="1"></text>'
+    "</transcript>"
+)
+
+
+def track(language_code: str, name: str, kind: str = "", query: str = "") -> dict:
+    data = {
+        "baseUrl": f"{{base}}/api/timedtext?lang={language_code}&fmt=srv3{query}",
+        "name": {"runs": [{"text": name}]},
+        "languageCode": language_code,
+        "isTranslatable": False,
+    }
+    if kind:
+        data["kind"] = kind
+    return data
+
+
+def captions(*tracks: dict) -> dict:
+    return {
+        "playabilityStatus": {"status": "OK"},
+        "captions": {"playerCaptionsTracklistRenderer": {"captionTracks": list(tracks), "translationLanguages": []}},
+    }
+
+
+def unplayable(status: str, reason: str, subreasons: tuple = ()) -> dict:
+    error_screen = {"playerErrorMessageRenderer": {"subreason": {"runs": [{"text": text} for text in subreasons]}}}
+    return {"playabilityStatus": {"status": status, "reason": reason, "errorScreen": error_screen}}
+
+
+# video_id -> player API response
+PLAYER = {
+    "manual": captions(track("en", "English (auto)", "asr"), track("en", "English")),
+    "generated": captions(track("de", "Deutsch (automatisch)", "asr")),
+    "pot": captions(track("en", "English", query="&exp=xpe")),
+    "disabled": {"playabilityStatus": {"status": "OK"}},
+    "bot": unplayable("LOGIN_REQUIRED", BOT_DETECTED_REASON),
+    "age": unplayable("LOGIN_REQUIRED", "This video may be inappropriate for some users."),
+    "gone": unplayable("ERROR", "This video is unavailable"),
+    "private": unplayable("UNPLAYABLE", "Private video", ("Ask the owner",)),
+}
+
+
+@pytest.fixture(scope="module")
+def youtube():
+    """Local stand-in for the watch page, player API and caption track endpoints."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status: int, body: str, content_type: str = "text/html") -> None:
+            encoded = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/api/timedtext":
+                self.reply(200, CAPTIONS_XML, "text/xml")
+                return
+            video_id = query["v"][0]
+            if video_id == "throttled":
+                self.reply(429, "Too Many Requests")
+            elif video_id == "captcha":
+                self.reply(200, '<div class="g-recaptcha"></div>')
+            elif video_id == "changed":
+                self.reply(200, "<html>no key here</html>")
+            elif video_id == "consent":
+                self.reply(200, CONSENT_HTML)
+            else:
+                self.reply(200, WATCH_HTML)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            assert self.path == "/youtubei/v1/player?key=test-key"
+            video_id = body["videoId"]
+            if video_id == "broken":
+                self.reply(503, "Service Unavailable", "text/plain")
+            else:
+                # caption track URLs point back at this server
+                data = json.dumps(PLAYER.get(video_id, PLAYER["manual"]))
+                self.reply(200, data.replace("{base}", f"http://{self.headers['Host']}"), "application/json")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def fetch(base_url: str, video_id: str, languages=("en",)):
+    async def run():
+        client = AsyncTranscriptClient(base_url=base_url)
+        try:
+            return await client.fetch(video_id, languages)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_prefers_the_manual_track_and_parses_it(youtube):
+    transcript = fetch(youtube, "manual")
+    assert (transcript.video_id, transcript.language, transcript.language_code) == ("manual", "English", "en")
+    assert not transcript.is_generated
+    assert [(entry.text, entry.start, entry.duration) for entry in transcript] == [
+        ("Hello & welcome", 0.5, 2.25),
+        ("no duration", 2.75, 0.0),
+    ]
+
+
+def test_falls_back_through_languages_to_a_generated_track(youtube):
+    transcript = fetch(youtube, "generated", ("en", "de"))
+    assert (transcript.language_code, transcript.is_generated) == ("de", True)
+
+
+def test_consent_page_that_keeps_coming_back(youtube):
+    with pytest.raises(FailedToCreateConsentCookie):
+        fetch(youtube, "consent")
+
+
+@pytest.mark.parametrize(
+    "video_id, error",
+    [
+        ("throttled", IpBlocked),
+        ("captcha", IpBlocked),
+        ("changed", YouTubeDataUnparsable),
+        ("broken", YouTubeRequestFailed),
+        ("disabled", TranscriptsDisabled),
+        ("bot", RequestBlocked),
+        ("age", AgeRestricted),
+        ("gone", VideoUnavailable),
+        ("private", VideoUnplayable),
+        ("pot", PoTokenRequired),
+    ],
+)
+def test_maps_upstream_failures_to_library_errors(youtube, video_id, error):
+    with pytest.raises(error) as raised:
+        fetch(youtube, video_id)
+    assert raised.value.video_id == video_id
+
+
+def test_missing_language_lists_what_is_available(youtube):
+    with pytest.raises(NoTranscriptFound, match="English"):
+        fetch(youtube, "manual", ("fr",))
+
+
+def test_server_errors_keep_the_status_for_retries(youtube):
+    with pytest.raises(YouTubeRequestFailed) as raised:
+        fetch(youtube, "broken")
+    assert "503" in raised.value.reason
@@ -3,33 +3,596 @@ Auth0 OAuth token verification for YouTube MCP Server.
 """
 
 import os
+import re
+import json
+import time
+import base64
 import asyncio
-from typing import Optional
-from jwt import PyJWKClient, decode, InvalidTokenError
+import hashlib
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+import httpx
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+from jwt import (
+    PyJWK,
+    PyJWKSet,
+    decode,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+    InvalidTokenError,
+)
 from mcp.server.auth.provider import AccessToken, TokenVerifier
 
+from utils.executor import BoundedExecutor, FetchQueueFull
+from utils.singleflight import SingleFlight
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# Anything larger is not an Auth0 access token; refuse it before decoding
+MAX_TOKEN_CHARS = 16384
+
+
+def token_hash(token: str) -> bytes:
+    """Digest used as cache key, so raw bearer tokens are never kept as dict keys."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class VerifiedTokenCache:
+    """
+    LRU of already-verified AccessTokens keyed by token hash, each valid until the token's exp.
+
+    Every request in an MCP session carries the same bearer token; only the first one needs
+    the signature check.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # token hash -> (access token, expires_at as epoch seconds); least -> most recently used
+        self._entries: OrderedDict[bytes, tuple[AccessToken, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[AccessToken]:
+        key = token_hash(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        access_token, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return access_token
+
+    def put(self, token: str, access_token: AccessToken) -> None:
+        # Tokens without exp are never cached: there is no safe point to stop trusting them
+        if self.max_entries <= 0 or access_token.expires_at is None:
+            return
+        key = token_hash(token)
+        self._entries.pop(key, None)
+        self._entries[key] = (access_token, float(access_token.expires_at))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+
+
+class RejectedTokenCache:
+    """Short-lived memory of rejected token hashes, so replays fail without any parsing or crypto."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # token hash -> expires_at (monotonic); least -> most recently rejected
+        self._entries: OrderedDict[bytes, float] = OrderedDict()
+        self.hits = 0
+        self.recorded = 0
+
+    def contains(self, token: str) -> bool:
+        key = token_hash(token)
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, token: str) -> None:
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        key = token_hash(token)
+        self._entries.pop(key, None)
+        self._entries[key] = time.monotonic() + self.ttl
+        self.recorded += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "recorded": self.recorded,
+        }
+
+
+class PrecheckFailed(InvalidTokenError):
+    """Token rejected from its unverified header/claims, before any key lookup or signature check."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class UnknownSigningKey(InvalidTokenError):
+    """Raised when a token's kid is not in the JWKS, even after a (rate-limited) refetch."""
+
+
+def b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def b64url_json(segment: str) -> dict:
+    data = json.loads(b64url_decode(segment))
+    if not isinstance(data, dict):
+        raise ValueError("JWT segment is not a JSON object")
+    return data
+
+
+class ParsedToken(NamedTuple):
+    """A compact JWS split and decoded once, shared by the precheck and the signature check."""
+
+    header: dict
+    payload: dict
+    signing_input: bytes
+    signature: bytes
+
+
+def verify_rs256(key: rsa.RSAPublicKey, signature: bytes, signing_input: bytes) -> None:
+    key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+
+
+def verify_es256(key: ec.EllipticCurvePublicKey, signature: bytes, signing_input: bytes) -> None:
+    if key.curve.name != "secp256r1":
+        raise InvalidAlgorithmError("ES256 requires a P-256 key")
+    # JWS carries the raw 32-byte r and s; cryptography expects them DER-encoded
+    if len(signature) != 64:
+        raise InvalidSignature()
+    r = int.from_bytes(signature[:32], "big")
+    s = int.from_bytes(signature[32:], "big")
+    key.verify(encode_dss_signature(r, s), signing_input, ec.ECDSA(hashes.SHA256()))
+
+
+def verify_eddsa(key: ed25519.Ed25519PublicKey | ed448.Ed448PublicKey, signature: bytes, signing_input: bytes) -> None:
+    key.verify(signature, signing_input)
+
+
+# Algorithms checked directly against the key objects cached per kid: (expected key types, verifier).
+# Any other algorithm allowed by AUTH0_ALGORITHMS goes through jwt.decode.
+SIGNATURE_VERIFIERS = {
+    "RS256": (rsa.RSAPublicKey, verify_rs256),
+    "ES256": (ec.EllipticCurvePublicKey, verify_es256),
+    "EdDSA": ((ed25519.Ed25519PublicKey, ed448.Ed448PublicKey), verify_eddsa),
+}
+
+# Public keys parsed inside a verification worker process, keyed by their DER encoding
+_worker_keys: dict[bytes, object] = {}
+
+
+def verify_with_der(algorithm: str, public_der: bytes, signature: bytes, signing_input: bytes) -> None:
+    """Signature check run in a worker process; key objects don't pickle, so DER is sent instead."""
+    key = _worker_keys.get(public_der)
+    if key is None:
+        key = _worker_keys[public_der] = serialization.load_der_public_key(public_der)
+    SIGNATURE_VERIFIERS[algorithm][1](key, signature, signing_input)
+
+
+class SignatureOffload:
+    """
+    Moves signature checks off the event loop onto a bounded thread or process pool.
+
+    With auto_threshold > 0, checks run inline while traffic is light and go to the pool only
+    while verifications pile up: at least auto_threshold started within the last window seconds,
+    or the pool still has work queued or running. auto_threshold 0 always uses the pool.
+    """
+
+    def __init__(
+        self,
+        pool: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 64,
+        auto_threshold: int = 4,
+        window: float = 0.1,
+    ):
+        if pool not in ("thread", "process"):
+            raise ValueError(f"Unknown verification pool: {pool}. Use thread or process")
+        self.pool = pool
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.auto_threshold = auto_threshold
+        self.window = window
+        self._executor: Optional[BoundedExecutor] = None
+        self._recent: deque[float] = deque()
+        # kid -> (key object, DER) for process workers; checked by identity so rotations re-encode
+        self._public_der: dict[str, tuple[object, bytes]] = {}
+        self.inline = 0
+        self.offloaded = 0
+        self.overflow = 0
+        self.rebuilds = 0
+
+    def _build(self) -> BoundedExecutor:
+        executor = None
+        if self.pool == "process":
+            # fork: spawn/forkserver would re-import the server module in every worker.
+            # Workers are forked here, at startup, and then only run verify_with_der.
+            executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("fork")
+            )
+        return BoundedExecutor(
+            self.max_workers, self.max_queue, executor=executor, thread_name_prefix="jwt-verify"
+        )
+
+    async def start(self) -> None:
+        if self._executor is not None:
+            return
+        self._executor = self._build()
+        await self._executor.run(int)  # start the workers before the first real token
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def should_offload(self) -> bool:
+        """Record one verification start and decide whether it goes to the pool."""
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent[0] <= now - self.window:
+            self._recent.popleft()
+        if self._executor is None:
+            return False
+        if self.auto_threshold <= 0:
+            return True
+        return (
+            len(self._recent) >= self.auto_threshold
+            or self._executor.active + self._executor.queued > 0
+        )
+
+    async def verify(self, kid: str, algorithm: str, key, signature: bytes, signing_input: bytes) -> None:
+        """Check signature against key; raises InvalidSignature like the direct verifiers."""
+        verify = SIGNATURE_VERIFIERS[algorithm][1]
+        if not self.should_offload():
+            self.inline += 1
+            verify(key, signature, signing_input)
+            return
+
+        executor = self._executor
+        try:
+            if self.pool == "process":
+                cached = self._public_der.get(kid)
+                if cached is None or cached[0] is not key:
+                    der = key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+                    cached = self._public_der[kid] = (key, der)
+                await executor.run(verify_with_der, algorithm, cached[1], signature, signing_input)
+            else:
+                await executor.run(verify, key, signature, signing_input)
+            self.offloaded += 1
+        except FetchQueueFull:
+            # Pool backlog is full: verifying inline is slower for the loop but never fails auth
+            self.overflow += 1
+            verify(key, signature, signing_input)
+        except BrokenExecutor:
+            # A worker died (e.g. OOM-killed): verify this one inline and replace the pool once,
+            # however many in-flight checks saw it break. The replacement is a thread pool: forking
+            # new workers from the running, multi-threaded server could deadlock them.
+            if self._executor is executor:
+                print(f"Signature verification {self.pool} pool broke; replacing it with a thread pool")
+                executor.shutdown()
+                self.pool = "thread"
+                self._executor = self._build()
+                self.rebuilds += 1
+            self.overflow += 1
+            verify(key, signature, signing_input)
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool,
+            "auto_threshold": self.auto_threshold,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "overflow_inline": self.overflow,
+            "rebuilds": self.rebuilds,
+            "recent": len(self._recent),
+            "executor": self._executor.stats() if self._executor is not None else None,
+        }
+
+
+class AsyncJWKSClient:
+    """
+    In-memory JWKS fetched with httpx: prefetched at startup, refreshed in the background before
+    it goes stale, and refetched (once, however many requests ask) when a token names an unknown kid.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 600,
+        min_refetch_interval: float = 30,
+        timeout: float = 10,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        # Floor between fetches, so tokens with made-up kids can't hammer the JWKS endpoint
+        self.min_refetch_interval = min_refetch_interval
+        self._http = http_client or httpx.AsyncClient(timeout=timeout)
+        self._keys: dict[str, PyJWK] = {}
+        self._flights = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._next_refresh = refresh_interval
+        self.fetched_at: Optional[float] = None
+        # Set on every attempt, failed or not, so a down endpoint isn't hit once per token
+        self.last_attempt_at: Optional[float] = None
+        self.fetches = 0
+        self.fetch_failures = 0
+        self.unknown_kid_misses = 0
+
+    async def start(self) -> None:
+        """Prefetch the keys and start refreshing them in the background."""
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Not fatal: the first token (or the refresh loop) fetches again
+            print(f"JWKS prefetch from {self.url} failed: {e}")
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        await self._http.aclose()
+
+    async def refresh(self) -> None:
+        """Fetch the key set; concurrent callers share one request."""
+        await self._flights.do(self.url, self._fetch)
+
+    async def _fetch(self) -> None:
+        self.fetches += 1
+        self.last_attempt_at = time.monotonic()
+        try:
+            response = await self._http.get(self.url)
+            response.raise_for_status()
+            key_set = PyJWKSet.from_dict(response.json())
+        except Exception:
+            self.fetch_failures += 1
+            raise
+        # Each JWK is parsed into a cryptography public key object once here, then reused per kid.
+        # Replace wholesale: keys removed from the set (rotated out) stop being trusted
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+        self.fetched_at = time.monotonic()
+
+        # Refresh ahead of the server's cache lifetime when it advertises one
+        match = MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) * 0.8 if match else self.refresh_interval
+        self._next_refresh = max(self.min_refetch_interval, min(self.refresh_interval, max_age))
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._next_refresh)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep verifying with the current keys; try again on the next tick
+                print(f"JWKS refresh from {self.url} failed: {e}")
+                self._next_refresh = self.min_refetch_interval
+
+    async def get_signing_key(self, kid: str) -> PyJWK:
+        """Key for kid, refetching the set once if kid is not known yet (e.g. after a rotation)."""
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        recently_attempted = (
+            self.last_attempt_at is not None
+            and time.monotonic() - self.last_attempt_at < self.min_refetch_interval
+        )
+        if not recently_attempted:
+            self.unknown_kid_misses += 1
+            await self.refresh()
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+        raise UnknownSigningKey(f"Unable to find a signing key that matches: {kid!r}")
+
+    def stats(self) -> dict:
+        algorithms: dict[str, int] = {}
+        for key in self._keys.values():
+            algorithms[key.algorithm_name] = algorithms.get(key.algorithm_name, 0) + 1
+        return {
+            "keys": len(self._keys),
+            "algorithms": algorithms,
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+            "unknown_kid_misses": self.unknown_kid_misses,
+            "age_seconds": round(time.monotonic() - self.fetched_at, 1) if self.fetched_at is not None else None,
+            "next_refresh_seconds": round(self._next_refresh, 1),
+        }
+
 
 class Auth0TokenVerifier(TokenVerifier):
     """Verifies OAuth tokens issued by Auth0."""
 
-    def __init__(self, domain: str, audience: str, algorithms: Optional[list[str]] = None):
+    def __init__(
+        self,
+        domain: str,
+        audience: str,
+        algorithms: Optional[list[str]] = None,
+        token_cache: Optional[VerifiedTokenCache] = None,
+        jwks_url: Optional[str] = None,
+        jwks_client: Optional[AsyncJWKSClient] = None,
+        rejected_tokens: Optional[RejectedTokenCache] = None,
+        offload: Optional[SignatureOffload] = None,
+    ):
         self.domain = domain
         self.audience = audience
         self.algorithms = algorithms or ["RS256"]
-        self.jwks_url = f"https://{domain}/.well-known/jwks.json"
+        self.jwks_url = jwks_url or f"https://{domain}/.well-known/jwks.json"
         self.issuer = f"https://{domain}/"
-        # PyJWKClient handles JWKS fetching and caching
-        self.jwks_client = PyJWKClient(self.jwks_url)
+        # Keys are fetched asynchronously and kept in memory; requests don't wait on JWKS I/O
+        self.jwks_client = jwks_client or AsyncJWKSClient(self.jwks_url)
+        self.token_cache = token_cache
+        self.rejected_tokens = rejected_tokens
+        # None verifies signatures inline on the event loop
+        self.offload = offload
+        self.verified = 0
+        self.rejected = 0
+        self.precheck_rejections: dict[str, int] = {}
+        self.full_verifications = 0
+        self.verify_seconds = 0.0
+        # algorithm -> [full verifications, seconds spent]
+        self.algorithm_costs: dict[str, list] = {}
+
+    async def start(self) -> None:
+        """Prefetch signing keys and keep them refreshed (call from the server lifespan)."""
+        if self.offload is not None:
+            await self.offload.start()
+        await self.jwks_client.start()
+
+    async def stop(self) -> None:
+        await self.jwks_client.stop()
+        if self.offload is not None:
+            self.offload.shutdown()
 
     async def verify_token(self, token: str) -> AccessToken | None:
         """Verify Auth0 JWT token and return access information."""
+        if self.token_cache is not None:
+            cached = self.token_cache.get(token)
+            if cached is not None:
+                return cached
+        if self.rejected_tokens is not None and self.rejected_tokens.contains(token):
+            self.rejected += 1
+            return None
+
         try:
-            # Get signing key from JWKS (PyJWKClient handles this synchronously)
-            # Run in thread pool to avoid blocking async event loop
-            signing_key = await asyncio.to_thread(
-                self.jwks_client.get_signing_key_from_jwt, token
-            )
+            # Malformed, expired or foreign tokens never reach the key lookup or signature check
+            parsed = self.precheck(token)
+        except PrecheckFailed as e:
+            self.precheck_rejections[e.reason] = self.precheck_rejections.get(e.reason, 0) + 1
+            self._reject(token)
+            return None
+
+        self.full_verifications += 1
+        started = time.perf_counter()
+        try:
+            access_token = await self._verify(token, parsed)
+        except (ImmatureSignatureError, UnknownSigningKey) as e:
+            # May pass shortly (clock skew, or a rotated key the next refetch picks up),
+            # so reject this request without remembering the token as bad
+            print(f"JWT verification failed: {e}")
+            self.rejected += 1
+            return None
+        except InvalidTokenError as e:
+            print(f"JWT verification failed: {e}")
+            self._reject(token)
+            return None
+        except Exception as e:
+            # Not the token's fault (e.g. JWKS unreachable), so don't remember it as bad
+            print(f"Token verification error: {e}")
+            self.rejected += 1
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            self.verify_seconds += elapsed
+            cost = self.algorithm_costs.setdefault(parsed.header["alg"], [0, 0.0])
+            cost[0] += 1
+            cost[1] += elapsed
+
+        self.verified += 1
+        if self.token_cache is not None:
+            self.token_cache.put(token, access_token)
+        return access_token
+
+    def _reject(self, token: str) -> None:
+        self.rejected += 1
+        if self.rejected_tokens is not None:
+            self.rejected_tokens.add(token)
+
+    def precheck(self, token: str) -> ParsedToken:
+        """
+        Structural parse and unverified alg/kid/exp/iss/aud checks; returns the decoded token.
+
+        Raises PrecheckFailed for tokens the full verification would reject anyway.
+        """
+        parts = token.split(".")
+        if len(token) > MAX_TOKEN_CHARS or len(parts) != 3 or not all(parts):
+            raise PrecheckFailed("malformed", "Token is not a compact JWS")
+        try:
+            header = b64url_json(parts[0])
+            payload = b64url_json(parts[1])
+            signature = b64url_decode(parts[2])
+        except ValueError:
+            raise PrecheckFailed("malformed", "Token header or payload is not base64url JSON") from None
+
+        if header.get("alg") not in self.algorithms:
+            raise PrecheckFailed("algorithm", f"Token algorithm {header.get('alg')!r} is not allowed")
+        kid = header.get("kid")
+        if not isinstance(kid, str) or not kid:
+            raise PrecheckFailed("kid", "Token header has no kid")
+
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            raise PrecheckFailed("expired", "Token is expired or has no exp")
+        if payload.get("iss") != self.issuer:
+            raise PrecheckFailed("issuer", "Token issuer does not match")
+        audience = payload.get("aud")
+        audiences = [audience] if isinstance(audience, str) else audience if isinstance(audience, list) else []
+        if self.audience not in audiences:
+            raise PrecheckFailed("audience", "Token audience does not match")
+        signing_input = token[:len(parts[0]) + len(parts[1]) + 1].encode("ascii")
+        return ParsedToken(header, payload, signing_input, signature)
+
+    async def _verify(self, token: str, parsed: ParsedToken) -> AccessToken:
+        """Full JWKS lookup and signature/claims verification; raises InvalidTokenError on failure."""
+        # Signing key comes from the in-memory JWKS; only an unknown kid triggers a fetch
+        algorithm = parsed.header["alg"]
+        signing_key = await self.jwks_client.get_signing_key(parsed.header["kid"])
+        if signing_key.algorithm_name != algorithm:
+            # Never let the token pick how a key is used (algorithm confusion)
+            raise InvalidAlgorithmError(f"Key {parsed.header['kid']!r} is not a {algorithm} key")
 
+        direct = SIGNATURE_VERIFIERS.get(algorithm)
+        if direct is None:
             # Decode and verify JWT
             payload = decode(
                 token,
@@ -45,29 +608,64 @@ class Auth0TokenVerifier(TokenVerifier):
                     "verify_iss": True,
                 }
             )
+        else:
+            # Verify against the parsed key object; exp/iss/aud were checked by precheck
+            key_types, verify_signature = direct
+            if not isinstance(signing_key.key, key_types):
+                raise InvalidAlgorithmError(f"Key {parsed.header['kid']!r} cannot verify {algorithm}")
+            try:
+                if self.offload is not None:
+                    await self.offload.verify(
+                        parsed.header["kid"], algorithm, signing_key.key, parsed.signature, parsed.signing_input
+                    )
+                else:
+                    verify_signature(signing_key.key, parsed.signature, parsed.signing_input)
+            except InvalidSignature:
+                raise InvalidSignatureError("Signature verification failed") from None
+            payload = parsed.payload
+            now = time.time()
+            for claim in ("iat", "nbf"):
+                if claim in payload:
+                    if not isinstance(payload[claim], (int, float)):
+                        raise InvalidTokenError(f"{claim} claim must be a number")
+                    if payload[claim] > now:
+                        raise ImmatureSignatureError(f"The token is not yet valid ({claim})")
 
-            # Extract scopes from token (optional; no enforcement)
-            scopes = []
-            if "scope" in payload:
-                scopes = payload["scope"].split()
-            elif "permissions" in payload:
-                scopes = payload["permissions"]
-
-            # Return AccessToken model (issuer/audience already validated)
-            return AccessToken(
-                token=token,
-                client_id=payload.get("azp") or payload.get("client_id", "unknown"),
-                scopes=scopes,
-                expires_at=payload.get("exp"),
-                resource=self.audience,
-            )
+        # Extract scopes from token (optional; no enforcement)
+        scopes = []
+        if "scope" in payload:
+            scopes = payload["scope"].split()
+        elif "permissions" in payload:
+            scopes = payload["permissions"]
 
-        except InvalidTokenError as e:
-            print(f"JWT verification failed: {e}")
-            return None
-        except Exception as e:
-            print(f"Token verification error: {e}")
-            return None
+        # Return AccessToken model (issuer/audience already validated)
+        return AccessToken(
+            token=token,
+            client_id=payload.get("azp") or payload.get("client_id", "unknown"),
+            scopes=scopes,
+            expires_at=payload.get("exp"),
+            resource=self.audience,
+        )
+
+    def stats(self) -> dict:
+        """Return verification counters and token cache metrics."""
+        return {
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "precheck_rejections": dict(self.precheck_rejections),
+            "full_verifications": self.full_verifications,
+            "avg_verify_ms": (
+                round(self.verify_seconds / self.full_verifications * 1000, 3) if self.full_verifications else 0.0
+            ),
+            "by_algorithm": {
+                algorithm: {"verifications": count, "avg_verify_ms": round(seconds / count * 1000, 3)}
+                for algorithm, (count, seconds) in self.algorithm_costs.items()
+            },
+            "jwks": self.jwks_client.stats(),
+            "token_cache": self.token_cache.stats() if self.token_cache is not None else None,
+            "rejected_tokens": self.rejected_tokens.stats() if self.rejected_tokens is not None else None,
+            "offload": self.offload.stats() if self.offload is not None else None,
+        }
 
 
 def create_auth0_verifier() -> Auth0TokenVerifier:
@@ -82,9 +680,28 @@ def create_auth0_verifier() -> Auth0TokenVerifier:
         raise ValueError("AUTH0_AUDIENCE environment variable is required")
 
     algorithms = [alg.strip() for alg in algorithms_str.split(",")]
+    cache_entries = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    rejected_ttl = float(os.getenv("AUTH_REJECTED_CACHE_TTL_SECONDS", "60"))
+    verify_pool = os.getenv("AUTH_VERIFY_POOL", "none").lower()
+    jwks_client = AsyncJWKSClient(
+        f"https://{domain}/.well-known/jwks.json",
+        refresh_interval=float(os.getenv("AUTH0_JWKS_REFRESH_SECONDS", "600")),
+        min_refetch_interval=float(os.getenv("AUTH0_JWKS_MIN_REFETCH_SECONDS", "30")),
+    )
 
     return Auth0TokenVerifier(
         domain=domain,
         audience=audience,
-        algorithms=algorithms
+        algorithms=algorithms,
+        token_cache=VerifiedTokenCache(max_entries=cache_entries) if cache_entries > 0 else None,
+        jwks_client=jwks_client,
+        rejected_tokens=RejectedTokenCache(
+            max_entries=int(os.getenv("AUTH_REJECTED_CACHE_MAX_ENTRIES", "10000")), ttl=rejected_ttl
+        ) if rejected_ttl > 0 else None,
+        offload=SignatureOffload(
+            pool=verify_pool,
+            max_workers=int(os.getenv("AUTH_VERIFY_POOL_WORKERS", "2")),
+            max_queue=int(os.getenv("AUTH_VERIFY_POOL_MAX_QUEUE", "64")),
+            auto_threshold=int(os.getenv("AUTH_VERIFY_AUTO_THRESHOLD", "4")),
+        ) if verify_pool != "none" else None,
     )
@@ -0,0 +1,255 @@
+"""
+In-process LRU caches for transcripts (bounded by TTL and total bytes) and for
+terminal fetch errors (negative cache), plus stale-while-revalidate refreshes.
+"""
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from youtube_transcript_api import (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+)
+
+# Errors that hold for the video in every language vs. only for the requested language
+VIDEO_LEVEL_ERRORS = (TranscriptsDisabled, VideoUnavailable, InvalidVideoId, AgeRestricted, VideoUnplayable)
+LANGUAGE_LEVEL_ERRORS = (NoTranscriptFound,)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached value in bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bytes):
+        return len(value)
+    if hasattr(value, "nbytes"):
+        # Compact transcripts know their size; add the object and array headers
+        return value.nbytes + 256
+    # Transcript-like objects: charge for segment text plus per-segment overhead
+    try:
+        return sum(len(entry.text.encode("utf-8")) + 64 for entry in value)
+    except TypeError:
+        return 64
+
+
+class TranscriptCache:
+    """
+    LRU cache keyed by (video_id, language, format) with TTL and a byte budget.
+
+    Entries past their TTL stay servable as stale for another stale_ttl seconds, so callers
+    can return them immediately while refreshing in the background.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 6 * 3600, stale_ttl: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (value, size, expires_at); order is least -> most recently used
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: Hashable) -> Optional[tuple[Any, bool]]:
+        """Return (value, is_stale), or None if missing or past the stale window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, expires_at = entry
+        now = time.monotonic()
+        if expires_at + self.stale_ttl <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if expires_at <= now:
+            self.stale_hits += 1
+            return value, True
+        self.hits += 1
+        return value, False
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired (stale entries count as missing)."""
+        entry = self.lookup(key)
+        if entry is None or entry[1]:
+            return None
+        return entry[0]
+
+    def discard(self, video_id: str, language: str) -> None:
+        """Drop every cached format of (video_id, language)."""
+        for key in [key for key in self._entries if key[:2] == (video_id, language)]:
+            self._remove(key)
+
+    def put(
+        self, key: Hashable, value: Any, size: Optional[int] = None, expires_at: Optional[float] = None
+    ) -> None:
+        """Insert value, evicting least recently used entries to stay within max_bytes."""
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            # Never let one huge transcript flush the whole cache
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        if expires_at is None:
+            expires_at = time.monotonic() + self.ttl
+        self._entries[key] = (value, size, expires_at)
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def put_derived(self, key: Hashable, value: Any, source_key: Hashable, source: Any) -> None:
+        """
+        Cache value rendered from source with source's remaining lifetime, so a render of a
+        stale copy is stale too. Skipped once source_key no longer holds source (e.g. a refresh
+        replaced it while the value was being built).
+        """
+        entry = self._entries.get(source_key)
+        if entry is None or entry[0] is not source:
+            return
+        self.put(key, value, expires_at=entry[2])
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class NegativeCache:
+    """Remembers terminal fetch errors for a short TTL so repeats fail without an upstream call."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 900):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (video_id, language or None) -> (error, expires_at); None covers every language
+        self._entries: OrderedDict[tuple[str, Optional[str]], tuple[Exception, float]] = OrderedDict()
+        self.hits = 0
+        self.recorded = 0
+
+    def is_cacheable(self, error: Exception) -> bool:
+        return isinstance(error, VIDEO_LEVEL_ERRORS + LANGUAGE_LEVEL_ERRORS)
+
+    def record(self, video_id: str, language: str, error: Exception) -> None:
+        """Remember error if it is terminal; other errors are ignored."""
+        if not self.is_cacheable(error) or self.ttl <= 0:
+            return
+        key = (video_id, None if isinstance(error, VIDEO_LEVEL_ERRORS) else language)
+        self._entries.pop(key, None)
+        self._entries[key] = (error, time.monotonic() + self.ttl)
+        self.recorded += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def check(self, video_id: str, language: str) -> None:
+        """Raise the remembered error for (video_id, language), if any."""
+        now = time.monotonic()
+        for key in ((video_id, None), (video_id, language)):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            error, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            self.hits += 1
+            # Drop the old traceback so repeated raises don't keep growing it
+            raise error.with_traceback(None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "recorded": self.recorded,
+        }
+
+
+class Revalidator:
+    """Runs background refreshes for stale entries, at most one per key at a time."""
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def refresh(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Start func(*args) in the background unless a refresh for key is already running."""
+        if key in self._tasks:
+            self.deduplicated += 1
+            return
+        self.started += 1
+        task = asyncio.create_task(func(*args))
+        self._tasks[key] = task
+        task.add_done_callback(partial(self._finished, key))
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        self._tasks.pop(key, None)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            self.succeeded += 1
+        else:
+            # The stale copy keeps being served; the next stale hit tries again
+            self.failed += 1
+            print(f"Background refresh of {key} failed: {error}")
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._tasks),
+            "started": self.started,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+def create_transcript_cache() -> TranscriptCache:
+    """Create TranscriptCache from environment variables."""
+    return TranscriptCache(
+        max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl=float(os.getenv("CACHE_TTL_SECONDS", str(6 * 3600))),
+        stale_ttl=float(os.getenv("CACHE_STALE_SECONDS", str(24 * 3600))),
+    )
+
+
+def create_negative_cache() -> NegativeCache:
+    """Create NegativeCache from environment variables."""
+    return NegativeCache(
+        max_entries=int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "10000")),
+        ttl=float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "900")),
+    )
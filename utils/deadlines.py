@@ -0,0 +1,46 @@
+"""
+Per-tool deadlines, tightened by the client's own timeout when it sends one.
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Answer a little before the client gives up, so it gets an error instead of silence
+CLIENT_TIMEOUT_MARGIN = 0.5
+
+
+def client_timeout(ctx) -> Optional[float]:
+    """Timeout in seconds the client advertised in the request _meta ("timeout"), if any."""
+    try:
+        meta = ctx.request_context.meta
+    except (AttributeError, ValueError):
+        return None
+    timeout = getattr(meta, "timeout", None) if meta is not None else None
+    try:
+        return float(timeout) if timeout is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def tool_deadline(tool_name: str, ctx=None) -> float:
+    """
+    Seconds a tool call may run: DEADLINE_<TOOL_NAME> or TOOL_DEADLINE_SECONDS, capped by the
+    client's timeout minus a small margin.
+    """
+    configured = float(os.getenv(f"DEADLINE_{tool_name.upper()}", os.getenv("TOOL_DEADLINE_SECONDS", "60")))
+    timeout = client_timeout(ctx) if ctx is not None else None
+    if timeout is not None:
+        return max(0.1, min(configured, timeout - CLIENT_TIMEOUT_MARGIN))
+    return configured
+
+
+@asynccontextmanager
+async def deadline(seconds: float, what: str):
+    """Cancel the enclosed work after seconds and raise a TimeoutError naming what timed out."""
+    try:
+        async with asyncio.timeout(seconds):
+            yield
+    except TimeoutError:
+        raise TimeoutError(f"{what} did not finish within {seconds:.1f}s") from None
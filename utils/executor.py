@@ -0,0 +1,109 @@
+"""
+Concurrency limit with a bounded queue for upstream transcript fetches and other blocking work.
+"""
+
+import os
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+
+
+class FetchQueueFull(Exception):
+    """Raised when too many fetches are already waiting for a worker."""
+
+
+class BoundedExecutor:
+    """
+    Bounds concurrent calls with a limited queue: blocking calls run on a dedicated thread (or
+    given process) pool, coroutines on the event loop under the same limit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_queue: int = 64,
+        executor: Optional[Executor] = None,
+        thread_name_prefix: str = "transcript-fetch",
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.thread_name_prefix = thread_name_prefix
+        # Dedicated pool so slow blocking calls never starve asyncio.to_thread users; only
+        # created on the first run(), so a limiter used just for run_async holds no threads
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.queued = 0
+        self.active = 0
+        self.max_queue_seen = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for one of max_workers slots, counting the wait as queue depth."""
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise FetchQueueFull(
+                f"Transcript fetch queue is full ({self.max_queue} waiting). Try again shortly."
+            )
+
+        self.queued += 1
+        self.max_queue_seen = max(self.max_queue_seen, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            yield
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run blocking func(*args, **kwargs) on the pool without blocking the event loop."""
+        async with self.slot():
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+                )
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def run_async(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Await func(*args, **kwargs) under the same concurrency limit and queue bound."""
+        async with self.slot():
+            return await func(*args, **kwargs)
+
+    def stats(self) -> dict:
+        """Return current queue depth and lifetime counters."""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue_seen": self.max_queue_seen,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_fetch_executor() -> BoundedExecutor:
+    """Create BoundedExecutor from environment variables."""
+    return BoundedExecutor(
+        max_workers=int(os.getenv("FETCH_MAX_WORKERS", "8")),
+        max_queue=int(os.getenv("FETCH_MAX_QUEUE", "64")),
+    )
@@ -0,0 +1,230 @@
+"""
+Transcript output formats (text, plain, SRT, WebVTT, JSON) and token-saving segment merging.
+"""
+
+import json
+from typing import Callable, NamedTuple
+
+from utils.transcript_index import TranscriptIndex
+
+# Granularity modes for merging caption fragments before formatting
+GRANULARITIES = ("raw", "sentence", "paragraph", "timestamp")
+
+SENTENCE_ENDINGS = (".", "?", "!", "…")
+
+# Auto-captions often have no punctuation; never let a "sentence" grow beyond this
+MAX_SENTENCE_SECONDS = 30.0
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as [MM:SS], or [H:MM:SS] from the first hour on"""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"[{hours}:{minutes:02d}:{seconds:02d}]"
+    return f"[{minutes:02d}:{seconds:02d}]"
+
+
+def format_cue_time(seconds: float, decimal_mark: str) -> str:
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_mark}{milliseconds:03d}"
+
+
+class OutputFormat(NamedTuple):
+    """How one format renders: text before/after the entries, entry separator, entry renderer."""
+
+    header: str
+    separator: str
+    footer: str
+    render: Callable[[int, float, float, str], str]
+
+
+FORMATS = {
+    "text": OutputFormat("", "\n", "", lambda i, start, duration, text: f"{format_timestamp(start)} {text}"),
+    "plain": OutputFormat("", "\n", "", lambda i, start, duration, text: text),
+    "srt": OutputFormat(
+        "", "\n\n", "\n",
+        lambda i, start, duration, text: (
+            f"{i + 1}\n{format_cue_time(start, ',')} --> {format_cue_time(start + duration, ',')}\n{text}"
+        ),
+    ),
+    "vtt": OutputFormat(
+        "WEBVTT\n\n", "\n\n", "\n",
+        lambda i, start, duration, text: (
+            f"{format_cue_time(start, '.')} --> {format_cue_time(start + duration, '.')}\n{text}"
+        ),
+    ),
+    "json": OutputFormat(
+        "[", ",\n", "]",
+        lambda i, start, duration, text: json.dumps(
+            {"start": start, "duration": duration, "text": text}, ensure_ascii=False
+        ),
+    ),
+}
+
+# Formats where the granularity savings line can be appended without breaking the output
+ANNOTATABLE_FORMATS = ("text", "plain")
+
+
+def get_format(name: str) -> OutputFormat:
+    if name not in FORMATS:
+        raise ValueError(f"Unknown format: {name}. Use one of: {', '.join(FORMATS)}")
+    return FORMATS[name]
+
+
+def transcript_rows(transcript):
+    """(start, duration, text) per entry; read straight from the columns of a TranscriptIndex"""
+    if isinstance(transcript, TranscriptIndex):
+        return transcript.rows()
+    return ((entry.start, entry.duration, entry.text) for entry in transcript)
+
+
+def render_transcript(transcript, format: str = "text", separator: str | None = None) -> str:
+    """Render transcript entries in one pass into a preallocated list of entries"""
+    output_format = get_format(format)
+    if not hasattr(transcript, "__len__"):
+        transcript = list(transcript)
+    render = output_format.render
+    rendered = [""] * len(transcript)
+    for i, (start, duration, text) in enumerate(transcript_rows(transcript)):
+        rendered[i] = render(i, start, duration, text)
+
+    joiner = output_format.separator if separator is None else separator
+    return output_format.header + joiner.join(rendered) + output_format.footer
+
+
+def format_transcript(transcript, separator: str = "\n") -> str:
+    """Format transcript entries with timestamps"""
+    return render_transcript(transcript, "text", separator)
+
+
+def iter_transcript_chunks(transcript, chunk_chars: int, format: str = "text", separator: str | None = None):
+    """
+    Yield (segments_done, chunk) pairs of rendered text, each roughly chunk_chars long.
+
+    Joining the chunks with the format's separator reproduces render_transcript's output.
+    """
+    output_format = get_format(format)
+    joiner = output_format.separator if separator is None else separator
+    chunk = []
+    size = 0
+    done = 0
+    for done, (start, duration, text) in enumerate(transcript_rows(transcript), start=1):
+        # Flush before adding, so the footer always lands on a chunk with entries in it
+        if size >= chunk_chars:
+            yield done - 1, joiner.join(chunk)
+            chunk = []
+            size = 0
+        line = output_format.render(done - 1, start, duration, text)
+        if done == 1:
+            line = output_format.header + line
+        chunk.append(line)
+        size += len(line) + len(joiner)
+
+    if done == 0:
+        yield 0, output_format.header + output_format.footer
+    else:
+        yield done, joiner.join(chunk) + output_format.footer
+
+
+def merge_segments(
+    transcript, granularity: str = "raw", interval: float = 30.0, format: str = "text"
+) -> tuple[TranscriptIndex, int]:
+    """
+    Merge caption fragments in a single pass according to granularity.
+
+    - raw: unchanged, one line per caption fragment
+    - sentence: fragments joined until a sentence ends
+    - paragraph: sentences joined until at least interval seconds have passed
+    - timestamp: fragments bucketed so a timestamp appears at most every interval seconds
+
+    Returns (segments, raw_chars) where raw_chars is the length the unmerged transcript would
+    have had in format (0 for raw, where nothing is merged).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}. Use one of: {', '.join(GRANULARITIES)}")
+
+    if granularity == "raw":
+        if not isinstance(transcript, TranscriptIndex):
+            transcript = TranscriptIndex(transcript)
+        return transcript, 0
+
+    output_format = get_format(format)
+    render = output_format.render
+    raw_chars = len(output_format.header) + len(output_format.footer) - len(output_format.separator)
+
+    starts: list[float] = []
+    durations: list[float] = []
+    merged_texts: list[str] = []
+    texts: list[str] = []
+    first_start = 0.0
+    last_end = 0.0
+    sentence_done = False
+
+    def flush() -> None:
+        if texts:
+            starts.append(first_start)
+            durations.append(last_end - first_start)
+            merged_texts.append(" ".join(texts))
+            texts.clear()
+
+    for i, entry in enumerate(transcript):
+        text = entry.text.strip()
+        raw_chars += len(render(i, entry.start, entry.duration, entry.text)) + len(output_format.separator)
+
+        # Close the pending segment before a fragment that starts past its cap (e.g. after a
+        # long silence), so no segment's timestamp is far from the text it covers
+        if texts:
+            waited = entry.start - first_start
+            if granularity == "timestamp" and waited >= interval:
+                flush()
+            elif granularity == "sentence" and waited >= MAX_SENTENCE_SECONDS:
+                flush()
+            elif granularity == "paragraph" and waited >= interval and (sentence_done or waited >= 2 * interval):
+                flush()
+        if not texts:
+            first_start = entry.start
+        if text:
+            texts.append(text)
+        last_end = max(last_end, entry.start + entry.duration)
+
+        elapsed = last_end - first_start
+        sentence_done = text.endswith(SENTENCE_ENDINGS)
+        if granularity == "sentence" and (sentence_done or elapsed >= MAX_SENTENCE_SECONDS):
+            flush()
+        elif granularity == "paragraph" and elapsed >= interval and (sentence_done or elapsed >= 2 * interval):
+            flush()
+
+    flush()
+    return TranscriptIndex.from_columns(starts, durations, merged_texts), max(raw_chars, 0)
+
+
+def savings_note(granularity: str, raw_chars: int, formatted_chars: int) -> str:
+    """One-line summary of how much shorter the merged transcript is than the raw one"""
+    saved = max(raw_chars - formatted_chars, 0)
+    percent = saved / raw_chars * 100 if raw_chars else 0.0
+    # ~4 characters per token is a good enough estimate for English text
+    return (
+        f"[granularity={granularity}: {formatted_chars:,} characters instead of {raw_chars:,} "
+        f"({percent:.0f}% fewer, ~{saved // 4:,} tokens saved)]"
+    )
+
+
+def structured_segments(transcript) -> dict:
+    """Column-oriented segments for structured MCP content"""
+    if isinstance(transcript, TranscriptIndex):
+        return {
+            "starts": transcript.starts.tolist(),
+            "durations": transcript.durations.tolist(),
+            "texts": list(transcript.texts()),
+        }
+    segments = transcript if hasattr(transcript, "__len__") else list(transcript)
+    return {
+        "starts": [entry.start for entry in segments],
+        "durations": [entry.duration for entry in segments],
+        "texts": [entry.text for entry in segments],
+    }
@@ -0,0 +1,110 @@
+"""
+Hedged upstream requests: start a backup attempt when the first one is slower than usual.
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class HedgePolicy:
+    """
+    Fires a second attempt if the first hasn't finished within a percentile of recent
+    latencies, returns whichever succeeds first and cancels the other.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def delay(self) -> float:
+        """Hedge delay: the configured percentile of recent latencies, clamped."""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self._latencies)
+        rank = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, ordered[rank]))
+
+    async def _timed(self, func: Callable[[], Awaitable[Any]], record_cancelled: bool = False) -> Any:
+        started = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # A primary that lost the race took at least this long; leaving it out would skew
+            # the window towards fast requests and keep the hedge delay too low
+            if record_cancelled:
+                self.record(time.monotonic() - started)
+            raise
+        self.record(time.monotonic() - started)
+        return result
+
+    async def run(self, primary: Callable[[], Awaitable[Any]], hedge: Callable[[], Awaitable[Any]]) -> Any:
+        """Await primary(); if it is slow, also start hedge() and return the first success."""
+        self.requests += 1
+        primary_task = asyncio.ensure_future(self._timed(primary, record_cancelled=True))
+        hedge_task = None
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay())
+            if done:
+                return primary_task.result()
+
+            self.hedged += 1
+            hedge_task = asyncio.ensure_future(self._timed(hedge))
+            pending = {primary_task, hedge_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both attempts failed: surface the primary's error
+            return primary_task.result()
+        finally:
+            for task in (primary_task, hedge_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "delay_ms": round(self.delay() * 1000, 1),
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+            "win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+        }
+
+
+def create_hedge_policy() -> HedgePolicy:
+    """Create HedgePolicy from environment variables."""
+    return HedgePolicy(
+        enabled=os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+        initial_delay=float(os.getenv("HEDGE_INITIAL_DELAY_SECONDS", "2")),
+        min_delay=float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5")),
+        max_delay=float(os.getenv("HEDGE_MAX_DELAY_SECONDS", "10")),
+    )
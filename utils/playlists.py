@@ -0,0 +1,120 @@
+"""
+Resolve YouTube playlist and channel URLs to the video IDs they contain.
+"""
+
+import os
+import re
+import json
+from typing import Iterator, Optional
+from urllib.parse import urlparse, parse_qs
+
+import httpx
+
+YOUTUBE_BASE_URL = "https://www.youtube.com"
+BROWSE_API_PATH = "/youtubei/v1/browse?key={api_key}"
+BROWSE_CONTEXT = {"client": {"clientName": "WEB", "clientVersion": "2.20250101.00.00", "hl": "en"}}
+
+INITIAL_DATA_PATTERN = re.compile(r"(?:var\s+ytInitialData|window\[\"ytInitialData\"\])\s*=\s*(\{.+?\})\s*;\s*</script>", re.DOTALL)
+API_KEY_PATTERN = re.compile(r'"INNERTUBE_API_KEY":\s*"([a-zA-Z0-9_-]+)"')
+CHANNEL_PATH_PATTERN = re.compile(r"^/(@[^/]+|channel/[^/]+|c/[^/]+|user/[^/]+)")
+
+# Renderers that represent one video in playlist and channel listings
+VIDEO_RENDERERS = ("playlistVideoRenderer", "videoRenderer", "gridVideoRenderer", "reelItemRenderer")
+
+
+class PlaylistResolveError(Exception):
+    """Raised when a playlist or channel page cannot be resolved."""
+
+
+def listing_path(url: str) -> str:
+    """Map a playlist or channel URL to the path of its video listing page."""
+    parsed = urlparse(url)
+    playlist_id = parse_qs(parsed.query).get("list", [None])[0]
+    if playlist_id:
+        return f"/playlist?list={playlist_id}"
+
+    channel_match = CHANNEL_PATH_PATTERN.match(parsed.path)
+    if channel_match:
+        return f"/{channel_match.group(1)}/videos"
+
+    raise ValueError("Not a YouTube playlist or channel URL")
+
+
+def _walk(node) -> Iterator[dict]:
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def _extract_page(data: dict) -> tuple[list[str], Optional[str]]:
+    """Return (video_ids, continuation_token) from ytInitialData or a browse response."""
+    video_ids = []
+    continuation = None
+    for node in _walk(data):
+        for renderer in VIDEO_RENDERERS:
+            video = node.get(renderer)
+            if isinstance(video, dict) and "videoId" in video:
+                video_ids.append(video["videoId"])
+        item = node.get("continuationItemRenderer")
+        if isinstance(item, dict):
+            token = (
+                item.get("continuationEndpoint", {})
+                .get("continuationCommand", {})
+                .get("token")
+            )
+            continuation = token or continuation
+    return video_ids, continuation
+
+
+async def resolve_video_ids(
+    client: httpx.AsyncClient,
+    url: str,
+    max_videos: int = 200,
+    base_url: str = YOUTUBE_BASE_URL,
+) -> list[str]:
+    """Resolve a playlist or channel URL to up to max_videos unique video IDs, in listing order."""
+    response = await client.get(base_url + listing_path(url))
+    if response.status_code != 200:
+        raise PlaylistResolveError(f"Listing page returned HTTP {response.status_code}")
+
+    html = response.text
+    data_match = INITIAL_DATA_PATTERN.search(html)
+    if not data_match:
+        raise PlaylistResolveError("Could not find ytInitialData on the listing page")
+
+    video_ids, continuation = _extract_page(json.loads(data_match.group(1)))
+    api_key_match = API_KEY_PATTERN.search(html)
+
+    seen = set()
+    ordered = []
+
+    def add(ids: list[str]) -> None:
+        for video_id in ids:
+            if video_id not in seen and len(ordered) < max_videos:
+                seen.add(video_id)
+                ordered.append(video_id)
+
+    add(video_ids)
+    while continuation and api_key_match and len(ordered) < max_videos:
+        response = await client.post(
+            base_url + BROWSE_API_PATH.format(api_key=api_key_match.group(1)),
+            json={"context": BROWSE_CONTEXT, "continuation": continuation},
+        )
+        if response.status_code != 200:
+            raise PlaylistResolveError(f"Continuation request returned HTTP {response.status_code}")
+        page_ids, next_continuation = _extract_page(response.json())
+        if not page_ids or next_continuation == continuation:
+            break
+        add(page_ids)
+        continuation = next_continuation
+
+    return ordered
+
+
+def youtube_base_url_from_env() -> str:
+    """Base URL for YouTube pages and APIs; override to point at a local stand-in server."""
+    return os.getenv("YOUTUBE_BASE_URL", YOUTUBE_BASE_URL).rstrip("/")
@@ -0,0 +1,231 @@
+"""
+Proxy pool with round-robin / least-latency selection, health probes and circuit breakers.
+"""
+
+import os
+import time
+import asyncio
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from youtube_transcript_api import PoTokenRequired, RequestBlocked, YouTubeRequestFailed
+
+from utils.cache import LANGUAGE_LEVEL_ERRORS, VIDEO_LEVEL_ERRORS
+from utils.retry import is_retryable, upstream_status
+
+# Reachability only: YouTube answers generate_204 even from exit IPs it blocks for transcripts,
+# so probes measure latency and catch dead proxies but never decide that a block has lifted
+HEALTH_PROBE_URL = "https://www.youtube.com/generate_204"
+
+# Errors about the video itself: the proxy delivered YouTube's answer, so they count as proxy success
+VIDEO_ERRORS = VIDEO_LEVEL_ERRORS + LANGUAGE_LEVEL_ERRORS + (PoTokenRequired,)
+
+
+def is_proxy_failure(error: Exception) -> bool:
+    """Blocks, transport errors and 429/5xx responses are the proxy's fault; nothing else is."""
+    if isinstance(error, (RequestBlocked, httpx.TransportError)):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        status = upstream_status(error)
+        return status is not None and (status == 429 or status >= 500)
+    return False
+
+
+class NoHealthyProxy(Exception):
+    """Raised when no proxy is left to choose from after exclusions."""
+
+
+class ProxyEndpoint:
+    """One proxy exit with latency tracking and a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, url: str):
+        self.url = url
+        parsed = urlparse(url)
+        # Never expose credentials in stats or errors
+        self.name = f"{parsed.hostname}:{parsed.port}" if parsed.port else str(parsed.hostname)
+        self.state = self.CLOSED
+        self.opened_until = 0.0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.trips = 0
+
+    def available(self, now: float) -> bool:
+        if self.state == self.OPEN and now >= self.opened_until:
+            # Cooldown elapsed: let traffic probe the proxy again
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "failures": self.failures,
+            "trips": self.trips,
+        }
+
+
+class ProxyPool:
+    """
+    Selects healthy proxies and trips per-proxy breakers after repeated failures.
+
+    When every breaker is open, select() falls back to the proxy tripped longest ago instead
+    of failing: a degraded exit beats none, and with a single proxy an open breaker would
+    otherwise take the whole server offline for the cooldown.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: str = "round_robin",
+        failure_threshold: int = 3,
+        cooldown: float = 300.0,
+        health_interval: float = 60.0,
+    ):
+        if strategy not in ("round_robin", "least_latency"):
+            raise ValueError(f"Unknown proxy selection strategy: {strategy}")
+        self.endpoints = [ProxyEndpoint(url) for url in urls]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_interval = health_interval
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self.fallbacks = 0
+
+    def select(self, exclude: tuple[ProxyEndpoint, ...] = ()) -> ProxyEndpoint:
+        """Pick a proxy whose breaker is not open, skipping any in exclude."""
+        if not self.endpoints:
+            raise ValueError("Proxy credentials not configured. Set PROXY_USERNAME, PROXY_PASSWORD, and PROXY_URL environment variables.")
+
+        now = time.monotonic()
+        allowed = [ep for ep in self.endpoints if ep not in exclude]
+        if not allowed:
+            raise NoHealthyProxy("No other proxy is configured.")
+        candidates = [ep for ep in allowed if ep.available(now)]
+        if not candidates:
+            # All breakers open: use the one closest to the end of its cooldown
+            self.fallbacks += 1
+            return min(allowed, key=lambda ep: ep.opened_until)
+
+        if self.strategy == "least_latency":
+            # Unmeasured proxies sort first so they get a latency sample
+            return min(candidates, key=lambda ep: (ep.latency or 0.0) * (ep.in_flight + 1))
+
+        endpoint = candidates[self._next % len(candidates)]
+        self._next += 1
+        return endpoint
+
+    def record_success(self, endpoint: ProxyEndpoint, latency: float) -> None:
+        endpoint.successes += 1
+        endpoint.consecutive_failures = 0
+        endpoint.state = ProxyEndpoint.CLOSED
+        self.record_latency(endpoint, latency)
+
+    def record_latency(self, endpoint: ProxyEndpoint, latency: float) -> None:
+        # Exponentially weighted moving average
+        endpoint.latency = latency if endpoint.latency is None else 0.8 * endpoint.latency + 0.2 * latency
+
+    def record_failure(self, endpoint: ProxyEndpoint, error: Exception) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        # A block counts like any other failure: rotating-IP proxies get a fresh exit next request
+        if endpoint.state == ProxyEndpoint.HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+            self.trip(endpoint)
+
+    def worth_retrying(self, error: Exception) -> bool:
+        """is_retryable, except a block is only retried when another proxy can take the retry."""
+        if isinstance(error, RequestBlocked):
+            now = time.monotonic()
+            return len(self.endpoints) > 1 and any(ep.available(now) for ep in self.endpoints)
+        return is_retryable(error)
+
+    def trip(self, endpoint: ProxyEndpoint) -> None:
+        endpoint.state = ProxyEndpoint.OPEN
+        endpoint.opened_until = time.monotonic() + self.cooldown
+        endpoint.trips += 1
+
+    async def probe(self, transcript_client, endpoint: ProxyEndpoint) -> None:
+        """
+        Send one lightweight request through endpoint: failures count against its breaker,
+        successes only update its latency (real fetches decide when a breaker closes).
+        """
+        started = time.monotonic()
+        try:
+            response = await transcript_client.get_client(endpoint.url).get(HEALTH_PROBE_URL)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Health probe returned HTTP {response.status_code}")
+        except Exception as e:
+            self.record_failure(endpoint, e)
+        else:
+            self.record_latency(endpoint, time.monotonic() - started)
+
+    async def _health_loop(self, transcript_client) -> None:
+        while True:
+            # Open breakers sit out their cooldown; after it, the next real fetch decides
+            now = time.monotonic()
+            await asyncio.gather(*(
+                self.probe(transcript_client, ep) for ep in self.endpoints if ep.available(now)
+            ))
+            await asyncio.sleep(self.health_interval)
+
+    def start_health_checks(self, transcript_client) -> None:
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop(transcript_client))
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "fallbacks": self.fallbacks,
+            "proxies": {ep.name: ep.stats() for ep in self.endpoints},
+        }
+
+
+def proxy_urls_from_env() -> list[str]:
+    """
+    Read proxy URLs from PROXY_URLS (comma-separated), falling back to the single PROXY_URL.
+
+    Entries without credentials ("host:port") use PROXY_USERNAME / PROXY_PASSWORD and are
+    skipped if those are unset; an empty pool fails at fetch time, not at startup.
+    """
+    proxy_username = os.getenv("PROXY_USERNAME")
+    proxy_password = os.getenv("PROXY_PASSWORD")
+    entries = [e.strip() for e in os.getenv("PROXY_URLS", os.getenv("PROXY_URL", "")).split(",") if e.strip()]
+
+    urls = []
+    for entry in entries:
+        if "://" in entry:
+            urls.append(entry)
+            continue
+        if proxy_username and proxy_password:
+            urls.append(f"http://{proxy_username}:{proxy_password}@{entry}")
+    return urls
+
+
+def create_proxy_pool() -> ProxyPool:
+    """Create ProxyPool from environment variables."""
+    return ProxyPool(
+        urls=proxy_urls_from_env(),
+        strategy=os.getenv("PROXY_STRATEGY", "round_robin"),
+        failure_threshold=int(os.getenv("PROXY_FAILURE_THRESHOLD", "3")),
+        cooldown=float(os.getenv("PROXY_COOLDOWN_SECONDS", "300")),
+        health_interval=float(os.getenv("PROXY_HEALTH_INTERVAL_SECONDS", "60")),
+    )
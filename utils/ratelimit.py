@@ -0,0 +1,123 @@
+"""
+Token-bucket rate limiting for upstream YouTube requests (global and per proxy).
+"""
+
+import os
+import time
+import asyncio
+from typing import Optional
+
+
+class RateLimited(Exception):
+    """Raised when a token would not become available within the allowed wait."""
+
+    def __init__(self, message: str, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class TokenBucket:
+    """Refills at rate tokens/sec up to burst; callers queue for a token up to max_wait seconds."""
+
+    def __init__(self, rate: float, burst: int, max_wait: float = 10.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the time waited."""
+        now = time.monotonic()
+        self._refill(now)
+
+        # Reserve the token now (the balance may go negative) so waiters are served in order
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if wait > self.max_wait:
+            self.rejected += 1
+            raise RateLimited(
+                f"Upstream rate limit reached; no capacity within {self.max_wait:g}s. Try again shortly.",
+                retry_after=wait,
+            )
+        self._tokens -= 1
+
+        if wait > 0:
+            self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the reservation back to the next caller
+                self._tokens += 1
+                raise
+            finally:
+                self.waiting -= 1
+
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait_seen = max(self.max_wait_seen, wait)
+        return wait
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 1) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_seen * 1000, 1),
+        }
+
+
+class UpstreamRateLimiter:
+    """A global bucket plus optional per-proxy buckets; a fetch needs a token from each."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        per_proxy_rate: float = 0,
+        per_proxy_burst: int = 1,
+        max_wait: float = 10.0,
+    ):
+        self.global_bucket = TokenBucket(rate, burst, max_wait) if rate > 0 else None
+        self.per_proxy_rate = per_proxy_rate
+        self.per_proxy_burst = per_proxy_burst
+        self.max_wait = max_wait
+        self.proxy_buckets: dict[str, TokenBucket] = {}
+
+    async def acquire(self, proxy_name: Optional[str] = None) -> None:
+        if self.global_bucket is not None:
+            await self.global_bucket.acquire()
+        if proxy_name is not None and self.per_proxy_rate > 0:
+            bucket = self.proxy_buckets.get(proxy_name)
+            if bucket is None:
+                bucket = TokenBucket(self.per_proxy_rate, self.per_proxy_burst, self.max_wait)
+                self.proxy_buckets[proxy_name] = bucket
+            await bucket.acquire()
+
+    def stats(self) -> dict:
+        return {
+            "global": self.global_bucket.stats() if self.global_bucket else None,
+            "per_proxy": {name: bucket.stats() for name, bucket in self.proxy_buckets.items()},
+        }
+
+
+def create_rate_limiter() -> UpstreamRateLimiter:
+    """Create UpstreamRateLimiter from environment variables (rates are fetches per second; 0 disables)."""
+    return UpstreamRateLimiter(
+        rate=float(os.getenv("UPSTREAM_RATE", "5")),
+        burst=int(os.getenv("UPSTREAM_BURST", "10")),
+        per_proxy_rate=float(os.getenv("UPSTREAM_PER_PROXY_RATE", "0")),
+        per_proxy_burst=int(os.getenv("UPSTREAM_PER_PROXY_BURST", "3")),
+        max_wait=float(os.getenv("UPSTREAM_RATE_MAX_WAIT_SECONDS", "10")),
+    )
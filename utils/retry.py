@@ -0,0 +1,127 @@
+"""
+Retry engine with jittered exponential backoff for transient upstream failures.
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from youtube_transcript_api import RequestBlocked, YouTubeRequestFailed
+
+# YouTubeRequestFailed only keeps the HTTP error text, e.g. "Server error '503 Service Unavailable' ..."
+STATUS_CODE_PATTERN = re.compile(r"'(\d{3}) ")
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def upstream_status(error: YouTubeRequestFailed) -> Optional[int]:
+    """HTTP status code of a failed YouTube request, if its error text includes one."""
+    match = STATUS_CODE_PATTERN.search(error.reason)
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Classify an upstream error as transient (worth retrying) or terminal."""
+    # Blocked exit IPs (incl. IpBlocked / 429s): a retry goes out through another proxy
+    # (ProxyPool.worth_retrying skips this when there is no other proxy to go through)
+    if isinstance(error, RequestBlocked):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        return upstream_status(error) in RETRYABLE_STATUS_CODES
+    # Timeouts, connection resets and proxy errors
+    if isinstance(error, httpx.TransportError):
+        return True
+    # Everything else (TranscriptsDisabled, VideoUnavailable, bad config, ...) won't change on retry
+    return False
+
+
+class RetryPolicy:
+    """
+    Retries retryable errors with full-jitter exponential backoff inside a per-call deadline.
+
+    retryable classifies errors (is_retryable by default). If a retry fails with one of the
+    unavailable errors (nothing left to retry with), the error that prompted it is raised instead.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 30.0,
+        retryable: Callable[[Exception], bool] = is_retryable,
+        unavailable: tuple[type[Exception], ...] = (),
+    ):
+        self.retryable = retryable
+        self.unavailable = unavailable
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.calls = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.terminal = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt (1-based), with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Await func(*args, **kwargs), retrying retryable errors until success, attempts or deadline run out."""
+        self.calls += 1
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 1
+        previous: Optional[Exception] = None
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if previous is not None and isinstance(e, self.unavailable):
+                    self.exhausted += 1
+                    raise previous from None
+                if not self.retryable(e):
+                    self.terminal += 1
+                    raise
+                delay = self.backoff(attempt)
+                if attempt >= self.max_attempts or time.monotonic() + delay >= give_up_at:
+                    self.exhausted += 1
+                    raise
+                self.retries += 1
+                attempt += 1
+                previous = e
+                await asyncio.sleep(delay)
+                continue
+
+            if attempt > 1:
+                self.recovered += 1
+            return result
+
+    def stats(self) -> dict:
+        """Return retry counters."""
+        return {
+            "max_attempts": self.max_attempts,
+            "calls": self.calls,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "terminal": self.terminal,
+        }
+
+
+def create_retry_policy(
+    retryable: Callable[[Exception], bool] = is_retryable, unavailable: tuple[type[Exception], ...] = ()
+) -> RetryPolicy:
+    """Create RetryPolicy from environment variables."""
+    return RetryPolicy(
+        max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+        base_delay=float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5")),
+        max_delay=float(os.getenv("RETRY_MAX_DELAY_SECONDS", "8")),
+        deadline=float(os.getenv("RETRY_DEADLINE_SECONDS", "30")),
+        retryable=retryable,
+        unavailable=unavailable,
+    )
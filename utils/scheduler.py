@@ -0,0 +1,236 @@
+"""
+Per-client quotas and weighted fair queuing of upstream fetches, keyed by OAuth client_id.
+"""
+
+import os
+import time
+import asyncio
+import itertools
+from heapq import heappop, heappush
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Hashable, Optional
+
+# Set while a batch tool runs on quota it paid for up front; its fetches aren't charged again
+quota_prepaid: ContextVar[bool] = ContextVar("quota_prepaid", default=False)
+
+
+class ClientThrottled(Exception):
+    """Raised when a client exceeds its request quota."""
+
+    def __init__(self, client_id: str, retry_after: float):
+        self.client_id = client_id
+        self.retry_after = retry_after
+        # The fetch may be shared with other clients, so the message never names one
+        super().__init__(f"Request quota exceeded. Retry after {retry_after:.0f}s.")
+
+
+class FairScheduler:
+    """
+    Grants a fixed number of upstream slots across clients with weighted fair queuing.
+
+    Each request gets a virtual finish tag (previous tag for its client + 1/weight), and free
+    slots go to the smallest tag whose client is under its concurrency cap, so a client with
+    a deep backlog cannot starve one that only sends the occasional request.
+
+    Callers register interest() in a key while they wait for shared work. A request acquired
+    with that key is queued under every interested client's tag and granted on whichever comes
+    up first, so nobody waits behind another client's backlog for a shared fetch. Its quota is
+    charged to the acquiring client, or to another interested client if that one is out.
+    """
+
+    def __init__(
+        self,
+        slots: int = 8,
+        max_per_client: int = 2,
+        quota_requests: int = 60,
+        quota_window: float = 60.0,
+        weights: dict[str, float] | None = None,
+    ):
+        self.slots = slots
+        self.max_per_client = max_per_client
+        self.quota_requests = quota_requests
+        self.quota_window = quota_window
+        self.weights = weights or {}
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+        self._active: dict[str, int] = defaultdict(int)
+        self._recent: dict[str, deque] = defaultdict(deque)
+        self._in_use = 0
+        # key -> (shared future, clients queued for it) for keyed requests not yet granted
+        self._pending: dict[Hashable, tuple[asyncio.Future, set[str]]] = {}
+        # key -> clients currently waiting on that work (one entry per waiting call)
+        self._interested: dict[Hashable, list[str]] = {}
+        self.granted = 0
+        self.joined = 0
+        self.throttled = 0
+
+    def _admit(self, client_id: str, now: float) -> float:
+        """Record a request if client_id is under its quota; else return seconds until it will be."""
+        if self.quota_requests <= 0:
+            return 0.0
+        recent = self._recent[client_id]
+        while recent and recent[0] <= now - self.quota_window:
+            recent.popleft()
+        if len(recent) >= self.quota_requests:
+            return recent[0] + self.quota_window - now
+        recent.append(now)
+        return 0.0
+
+    def check_quota(self, client_id: str) -> None:
+        """Sliding-window request quota; records the request if it is admitted."""
+        retry_after = self._admit(client_id, time.monotonic())
+        if retry_after:
+            self.throttled += 1
+            raise ClientThrottled(client_id, retry_after)
+
+    def _charge(self, client_id: str, key: Optional[Hashable]) -> None:
+        """Charge one request to client_id, or to another client waiting on key if it is out."""
+        now = time.monotonic()
+        retry_after = float("inf")
+        for candidate in dict.fromkeys([client_id, *self._interested.get(key, ())]):
+            wait = self._admit(candidate, now)
+            if not wait:
+                return
+            retry_after = min(retry_after, wait)
+        self.throttled += 1
+        raise ClientThrottled(client_id, retry_after)
+
+    @contextmanager
+    def prepaid(self, client_id: str):
+        """Charge one request up front; slots taken inside the block are not charged again."""
+        self.check_quota(client_id)
+        token = quota_prepaid.set(True)
+        try:
+            yield
+        finally:
+            quota_prepaid.reset(token)
+
+    @contextmanager
+    def interest(self, key: Hashable, client_id: str):
+        """Mark client_id as waiting on the work under key while the block runs."""
+        waiting = self._interested.setdefault(key, [])
+        waiting.append(client_id)
+        self.join(key, client_id)
+        try:
+            yield
+        finally:
+            waiting.remove(client_id)
+            if not waiting and self._interested.get(key) is waiting:
+                del self._interested[key]
+
+    def _enqueue(self, client_id: str, future: asyncio.Future) -> None:
+        weight = self.weights.get(client_id, 1.0)
+        tag = max(self._virtual_time, self._last_finish.get(client_id, 0.0)) + 1.0 / weight
+        self._last_finish[client_id] = tag
+        heappush(self._heap, (tag, next(self._seq), client_id, future))
+
+    def _dispatch(self) -> None:
+        skipped = []
+        while self._heap and self._in_use < self.slots:
+            item = heappop(self._heap)
+            tag, _, client_id, future = item
+            if future.done():
+                # Waiter was cancelled while queued
+                continue
+            if self._active[client_id] >= self.max_per_client:
+                skipped.append(item)
+                continue
+            self._virtual_time = tag
+            self._active[client_id] += 1
+            self._in_use += 1
+            self.granted += 1
+            # The result names the client charged for the slot (matters for shared requests)
+            future.set_result(client_id)
+        for item in skipped:
+            heappush(self._heap, item)
+
+    async def acquire(self, client_id: str, key: Optional[Hashable] = None, charge: bool = True) -> str:
+        """
+        Wait for an upstream slot on behalf of client_id; returns the client the slot is charged to.
+
+        charge counts the request against the quota (unless quota_prepaid is set), raising
+        ClientThrottled if neither client_id nor anyone else interested in key has quota left.
+        With a key, clients interested in it are queued for the request too.
+        """
+        if charge and not quota_prepaid.get():
+            self._charge(client_id, key)
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._pending[key] = (future, {client_id})
+        self._enqueue(client_id, future)
+        for waiting in set(self._interested.get(key, ())) - {client_id}:
+            self.join(key, waiting)
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled; hand it back
+                self.release(future.result())
+            raise
+        finally:
+            if key is not None and self._pending.get(key, (None,))[0] is future:
+                del self._pending[key]
+
+    def join(self, key: Hashable, client_id: str) -> None:
+        """Queue client_id for the still-waiting request under key, if there is one."""
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+        future, clients = pending
+        if future.done() or client_id in clients:
+            return
+        clients.add(client_id)
+        self.joined += 1
+        self._enqueue(client_id, future)
+        self._dispatch()
+
+    def release(self, client_id: str) -> None:
+        self._active[client_id] -= 1
+        if not self._active[client_id]:
+            del self._active[client_id]
+        self._in_use -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, client_id: str, key: Optional[Hashable] = None, charge: bool = True):
+        charged = await self.acquire(client_id, key, charge)
+        try:
+            yield charged
+        finally:
+            self.release(charged)
+
+    def stats(self) -> dict:
+        """Aggregate counters only: /stats is unauthenticated, so client_ids are never listed."""
+        queued = {id(future) for _, _, _, future in self._heap if not future.done()}
+        return {
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "queued": len(queued),
+            "active_clients": len(self._active),
+            "granted": self.granted,
+            "joined": self.joined,
+            "throttled": self.throttled,
+        }
+
+
+def create_client_scheduler() -> FairScheduler:
+    """Create FairScheduler from environment variables."""
+    # CLIENT_WEIGHTS format: "client_a=2,client_b=0.5"
+    weights = {}
+    for pair in os.getenv("CLIENT_WEIGHTS", "").split(","):
+        if "=" in pair:
+            client_id, weight = pair.split("=", 1)
+            weights[client_id.strip()] = float(weight)
+
+    return FairScheduler(
+        slots=int(os.getenv("CLIENT_SCHEDULER_SLOTS", os.getenv("FETCH_MAX_WORKERS", "8"))),
+        max_per_client=int(os.getenv("CLIENT_MAX_CONCURRENCY", "2")),
+        quota_requests=int(os.getenv("CLIENT_QUOTA_REQUESTS", "60")),
+        quota_window=float(os.getenv("CLIENT_QUOTA_WINDOW_SECONDS", "60")),
+        weights=weights,
+    )
@@ -0,0 +1,153 @@
+"""
+Durable SQLite transcript store so fetched transcripts survive restarts.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Optional
+
+from youtube_transcript_api import FetchedTranscript, FetchedTranscriptSnippet
+
+from utils.executor import BoundedExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    language_name TEXT NOT NULL,
+    is_generated INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    segment_count INTEGER NOT NULL,
+    segments BLOB NOT NULL,
+    PRIMARY KEY (video_id, language)
+);
+-- The primary key already serves video_id lookups; drop the duplicate from older databases
+DROP INDEX IF EXISTS idx_transcripts_video_id;
+CREATE INDEX IF NOT EXISTS idx_transcripts_language ON transcripts (language);
+CREATE INDEX IF NOT EXISTS idx_transcripts_fetched_at ON transcripts (fetched_at);
+"""
+
+
+def encode_segments(transcript: FetchedTranscript) -> bytes:
+    """Compress segments as zlib'd JSON columns: [[start...], [duration...], [text...]]."""
+    columns = [
+        [entry.start for entry in transcript],
+        [entry.duration for entry in transcript],
+        [entry.text for entry in transcript],
+    ]
+    return zlib.compress(json.dumps(columns, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_segments(blob: bytes) -> list[FetchedTranscriptSnippet]:
+    starts, durations, texts = json.loads(zlib.decompress(blob))
+    return [
+        FetchedTranscriptSnippet(text=text, start=start, duration=duration)
+        for start, duration, text in zip(starts, durations, texts)
+    ]
+
+
+class TranscriptStore:
+    """SQLite (WAL mode) store of fetched transcripts keyed by (video_id, language)."""
+
+    def __init__(self, path: str, max_age: float = 0, executor: Optional[BoundedExecutor] = None):
+        self.path = path
+        self.max_age = max_age
+        # SQLite serializes writers anyway; one dedicated thread keeps disk I/O off the event loop
+        self.executor = executor or BoundedExecutor(max_workers=1, max_queue=256)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Counted once here and maintained by _put, so stats() never queries SQLite
+        (self.rows,) = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _get(self, video_id: str, language: str) -> Optional[FetchedTranscript]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT language_name, is_generated, fetched_at, segments "
+                "FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language),
+            ).fetchone()
+        if row is None:
+            return None
+
+        language_name, is_generated, fetched_at, blob = row
+        if self.max_age and fetched_at + self.max_age <= time.time():
+            return None
+
+        return FetchedTranscript(
+            snippets=decode_segments(blob),
+            video_id=video_id,
+            language=language_name,
+            language_code=language,
+            is_generated=bool(is_generated),
+        )
+
+    def _put(self, transcript: FetchedTranscript, language: str) -> None:
+        blob = encode_segments(transcript)
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM transcripts WHERE video_id = ? AND language = ?",
+                (transcript.video_id, language),
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts "
+                "(video_id, language, language_name, is_generated, fetched_at, segment_count, segments) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    transcript.video_id,
+                    language,
+                    transcript.language,
+                    int(transcript.is_generated),
+                    time.time(),
+                    len(transcript),
+                    blob,
+                ),
+            )
+            if exists is None:
+                self.rows += 1
+
+    async def get(self, video_id: str, language: str) -> Optional[FetchedTranscript]:
+        """Return the stored transcript, or None if missing or older than max_age."""
+        transcript = await self.executor.run(self._get, video_id, language)
+        if transcript is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return transcript
+
+    async def put(self, transcript: FetchedTranscript, language: str) -> None:
+        """Insert or replace the stored transcript for (video_id, language)."""
+        await self.executor.run(self._put, transcript, language)
+        self.writes += 1
+
+    def stats(self) -> dict:
+        """Return store counters and row count."""
+        return {
+            "rows": self.rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "executor": self.executor.stats(),
+        }
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        with self._lock:
+            self._conn.close()
+
+
+def create_transcript_store() -> TranscriptStore:
+    """Create TranscriptStore from environment variables."""
+    return TranscriptStore(
+        path=os.getenv("TRANSCRIPT_DB_PATH", "transcripts.db"),
+        max_age=float(os.getenv("TRANSCRIPT_DB_MAX_AGE_SECONDS", "0")),
+    )
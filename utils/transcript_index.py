@@ -0,0 +1,192 @@
+"""
+Compact, binary-searchable transcript representation for windowed retrieval and search.
+
+Segments are stored column-wise: start times and durations in array('d'), and all texts in a
+single UTF-8 blob with an offsets array, instead of one Python object per caption fragment.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+
+class Segment(NamedTuple):
+    """One transcript segment, materialized on access."""
+
+    start: float
+    duration: float
+    text: str
+
+
+class TranscriptIndex:
+    """Transcript segments packed into flat arrays, with a sorted start-time index."""
+
+    __slots__ = ("starts", "durations", "_blob", "_offsets")
+
+    def __init__(self, transcript: Iterable = ()):
+        starts = array("d")
+        durations = array("d")
+        texts = []
+        for entry in transcript:
+            starts.append(entry.start)
+            durations.append(entry.duration)
+            texts.append(entry.text)
+        self._pack(starts, durations, texts)
+
+    @classmethod
+    def from_columns(cls, starts: Iterable[float], durations: Iterable[float], texts: Iterable[str]) -> "TranscriptIndex":
+        """Build directly from parallel start/duration/text columns."""
+        index = cls.__new__(cls)
+        index._pack(array("d", starts), array("d", durations), texts)
+        return index
+
+    def _pack(self, starts: array, durations: array, texts: Iterable[str]) -> None:
+        encoded = [text.encode("utf-8") for text in texts]
+        if not len(starts) == len(durations) == len(encoded):
+            raise ValueError("starts, durations and texts must have the same length")
+        offsets = array("Q", [0])
+        position = 0
+        for text in encoded:
+            position += len(text)
+            offsets.append(position)
+        self.starts = starts
+        self.durations = durations
+        self._blob = b"".join(encoded)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def texts(self) -> Iterator[str]:
+        offsets = self._offsets.tolist()
+        if self._blob.isascii():
+            # Byte offsets are character offsets: decode once and slice the str
+            text = self._blob.decode("ascii")
+            return (text[begin:end] for begin, end in zip(offsets, offsets[1:]))
+        blob = self._blob
+        return (blob[begin:end].decode("utf-8") for begin, end in zip(offsets, offsets[1:]))
+
+    def rows(self) -> Iterator[tuple[float, float, str]]:
+        """(start, duration, text) tuples, without building a Segment per row."""
+        return zip(self.starts, self.durations, self.texts())
+
+    def __iter__(self) -> Iterator[Segment]:
+        return map(Segment._make, self.rows())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            begin, end, step = key.indices(len(self.starts))
+            if step != 1:
+                return self.select(range(begin, end, step))
+            return self._slice(begin, max(begin, end))
+        if key < 0:
+            key += len(self.starts)
+        if not 0 <= key < len(self.starts):
+            raise IndexError("transcript segment index out of range")
+        return Segment(self.starts[key], self.durations[key], self.text(key))
+
+    def _slice(self, begin: int, end: int) -> "TranscriptIndex":
+        # Contiguous range: copy array slices and rebase offsets, no per-segment decoding
+        base = self._offsets[begin]
+        index = TranscriptIndex.__new__(TranscriptIndex)
+        index.starts = self.starts[begin:end]
+        index.durations = self.durations[begin:end]
+        index._blob = self._blob[base:self._offsets[end]]
+        index._offsets = array("Q", (offset - base for offset in self._offsets[begin:end + 1]))
+        return index
+
+    def select(self, indices: Iterable[int]) -> "TranscriptIndex":
+        """New transcript holding only the segments at indices, in the given order."""
+        indices = list(indices)
+        return TranscriptIndex.from_columns(
+            (self.starts[i] for i in indices),
+            (self.durations[i] for i in indices),
+            (self.text(i) for i in indices),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays and text blob."""
+        return (
+            len(self.starts) * self.starts.itemsize
+            + len(self.durations) * self.durations.itemsize
+            + len(self._offsets) * self._offsets.itemsize
+            + len(self._blob)
+        )
+
+    def index_at(self, time: float) -> int:
+        """Index of the segment on screen at time (the last one starting at or before it)."""
+        return max(bisect_right(self.starts, time) - 1, 0)
+
+    def window(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        cursor: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> tuple["TranscriptIndex", Optional[int]]:
+        """
+        Return (segments, next_cursor) for a time range and/or cursor, capped at max_chars of text.
+
+        next_cursor is the index to resume from, or None once the range is exhausted.
+        """
+        begin = cursor if cursor is not None else (self.index_at(start_time) if start_time is not None else 0)
+        end = bisect_right(self.starts, end_time) if end_time is not None else len(self.starts)
+        begin = min(max(begin, 0), len(self.starts))
+
+        if max_chars is None:
+            return self._slice(begin, max(begin, end)), None
+
+        # Sized from the offsets (UTF-8 bytes, close enough to characters) without decoding
+        offsets = self._offsets
+        chars = 0
+        stop = begin
+        while stop < end:
+            chars += offsets[stop + 1] - offsets[stop] + 10  # text plus "[MM:SS] " and newline
+            if chars > max_chars and stop > begin:
+                break
+            stop += 1
+
+        return self._slice(begin, max(begin, stop)), (stop if stop < end else None)
+
+    def search(self, query: str, max_results: Optional[int] = None) -> list[int]:
+        """
+        Indices of segments whose text contains query (case-insensitive), in order.
+
+        ASCII text is scanned directly in the blob, with match positions mapped back to segments
+        via the offsets; anything else is casefolded segment by segment.
+        """
+        if not query:
+            return []
+        if not (query.isascii() and self._blob.isascii()):
+            # bytes.lower() only folds ASCII, so compare casefolded str instead
+            needle = query.casefold()
+            matches = []
+            for i, text in enumerate(self.texts()):
+                if needle in text.casefold():
+                    matches.append(i)
+                    if max_results is not None and len(matches) >= max_results:
+                        break
+            return matches
+
+        needle = query.lower().encode("ascii")
+        haystack = self._blob.lower()
+        offsets = self._offsets
+        matches = []
+        position = haystack.find(needle)
+        while position != -1:
+            i = bisect_right(offsets, position) - 1
+            segment_end = offsets[i + 1]
+            if position + len(needle) <= segment_end:
+                matches.append(i)
+                if max_results is not None and len(matches) >= max_results:
+                    break
+                # One hit per segment is enough: continue from the next one
+                position = haystack.find(needle, segment_end)
+            else:
+                # Match straddles two segments' texts; look again further on
+                position = haystack.find(needle, position + 1)
+        return matches
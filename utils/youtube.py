@@ -0,0 +1,218 @@
+"""
+Async YouTube transcript client built on pooled httpx connections.
+"""
+
+import os
+import re
+import importlib.util
+from html import unescape
+from typing import Iterable, Optional
+
+import httpx
+from defusedxml import ElementTree
+from youtube_transcript_api import (
+    FetchedTranscript,
+    FetchedTranscriptSnippet,
+    TranscriptList,
+    VideoUnavailable,
+    YouTubeRequestFailed,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    FailedToCreateConsentCookie,
+    InvalidVideoId,
+    IpBlocked,
+    RequestBlocked,
+    AgeRestricted,
+    VideoUnplayable,
+    YouTubeDataUnparsable,
+    PoTokenRequired,
+)
+
+from utils.playlists import YOUTUBE_BASE_URL, youtube_base_url_from_env
+
+WATCH_PATH = "/watch?v={video_id}"
+INNERTUBE_API_PATH = "/youtubei/v1/player?key={api_key}"
+INNERTUBE_CONTEXT = {"client": {"clientName": "ANDROID", "clientVersion": "20.10.38"}}
+
+# Same playability reasons youtube_transcript_api checks for
+BOT_DETECTED_REASON = "Sign in to confirm you’re not a bot"
+AGE_RESTRICTED_REASON = "This video may be inappropriate for some users."
+VIDEO_UNAVAILABLE_REASON = "This video is unavailable"
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]*>", re.IGNORECASE)
+
+# HTTP/2 needs h2 (installed by the httpx[http2] extra); fall back to HTTP/1.1 keep-alive without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _raise_http_errors(response: httpx.Response, video_id: str) -> httpx.Response:
+    if response.status_code == 429:
+        raise IpBlocked(video_id)
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as error:
+        raise YouTubeRequestFailed(video_id, error)
+    return response
+
+
+class AsyncTranscriptClient:
+    """Fetches transcripts over long-lived, pooled httpx clients (one per proxy)."""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 15.0,
+        base_url: str = YOUTUBE_BASE_URL,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.base_url = base_url.rstrip("/")
+        self._clients: dict[Optional[str], httpx.AsyncClient] = {}
+
+    def get_client(self, proxy_url: Optional[str] = None) -> httpx.AsyncClient:
+        """Return the pooled client for proxy_url, creating it on first use."""
+        client = self._clients.get(proxy_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                proxy=proxy_url,
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers={"Accept-Language": "en-US"},
+            )
+            self._clients[proxy_url] = client
+        return client
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def fetch(
+        self,
+        video_id: str,
+        languages: Iterable[str] = ("en",),
+        proxy_url: Optional[str] = None,
+    ) -> FetchedTranscript:
+        """Fetch a transcript; raises the same exceptions as YouTubeTranscriptApi.fetch."""
+        client = self.get_client(proxy_url)
+        captions_json = await self._fetch_captions_json(client, video_id)
+        track = self._find_track(video_id, captions_json, languages)
+
+        url = track["baseUrl"].replace("&fmt=srv3", "")
+        if "&exp=xpe" in url:
+            raise PoTokenRequired(video_id)
+
+        response = await client.get(url)
+        snippets = self._parse_transcript(_raise_http_errors(response, video_id).text)
+        return FetchedTranscript(
+            snippets=snippets,
+            video_id=video_id,
+            language=track["name"]["runs"][0]["text"],
+            language_code=track["languageCode"],
+            is_generated=track.get("kind", "") == "asr",
+        )
+
+    async def _fetch_captions_json(self, client: httpx.AsyncClient, video_id: str) -> dict:
+        html = await self._fetch_video_html(client, video_id)
+        api_key = self._extract_innertube_api_key(html, video_id)
+        response = await client.post(
+            self.base_url + INNERTUBE_API_PATH.format(api_key=api_key),
+            json={"context": INNERTUBE_CONTEXT, "videoId": video_id},
+        )
+        innertube_data = _raise_http_errors(response, video_id).json()
+
+        self._assert_playability(innertube_data.get("playabilityStatus") or {}, video_id)
+        captions_json = innertube_data.get("captions", {}).get("playerCaptionsTracklistRenderer")
+        if captions_json is None or "captionTracks" not in captions_json:
+            raise TranscriptsDisabled(video_id)
+        return captions_json
+
+    async def _fetch_video_html(self, client: httpx.AsyncClient, video_id: str) -> str:
+        html = await self._fetch_html(client, video_id)
+        if 'action="https://consent.youtube.com/s"' in html:
+            match = re.search('name="v" value="(.*?)"', html)
+            if match is None:
+                raise FailedToCreateConsentCookie(video_id)
+            client.cookies.set("CONSENT", "YES+" + match.group(1), domain=".youtube.com")
+            html = await self._fetch_html(client, video_id)
+            if 'action="https://consent.youtube.com/s"' in html:
+                raise FailedToCreateConsentCookie(video_id)
+        return html
+
+    async def _fetch_html(self, client: httpx.AsyncClient, video_id: str) -> str:
+        response = await client.get(self.base_url + WATCH_PATH.format(video_id=video_id))
+        return unescape(_raise_http_errors(response, video_id).text)
+
+    def _extract_innertube_api_key(self, html: str, video_id: str) -> str:
+        match = re.search(r'"INNERTUBE_API_KEY":\s*"([a-zA-Z0-9_-]+)"', html)
+        if match:
+            return match.group(1)
+        if 'class="g-recaptcha"' in html:
+            raise IpBlocked(video_id)
+        raise YouTubeDataUnparsable(video_id)
+
+    def _assert_playability(self, playability_status_data: dict, video_id: str) -> None:
+        status = playability_status_data.get("status")
+        if status == "OK" or status is None:
+            return
+
+        reason = playability_status_data.get("reason")
+        if status == "LOGIN_REQUIRED":
+            if reason == BOT_DETECTED_REASON:
+                raise RequestBlocked(video_id)
+            if reason == AGE_RESTRICTED_REASON:
+                raise AgeRestricted(video_id)
+        if status == "ERROR" and reason == VIDEO_UNAVAILABLE_REASON:
+            if video_id.startswith(("http://", "https://")):
+                raise InvalidVideoId(video_id)
+            raise VideoUnavailable(video_id)
+        subreasons = (
+            playability_status_data.get("errorScreen", {})
+            .get("playerErrorMessageRenderer", {})
+            .get("subreason", {})
+            .get("runs", [])
+        )
+        raise VideoUnplayable(video_id, reason, [run.get("text", "") for run in subreasons])
+
+    def _find_track(self, video_id: str, captions_json: dict, languages: Iterable[str]) -> dict:
+        """Pick a caption track, preferring manually created ones (same order as TranscriptList)."""
+        tracks = captions_json["captionTracks"]
+        manual = {t["languageCode"]: t for t in tracks if t.get("kind", "") != "asr"}
+        generated = {t["languageCode"]: t for t in tracks if t.get("kind", "") == "asr"}
+        languages = list(languages)
+        for language_code in languages:
+            for track_dict in (manual, generated):
+                if language_code in track_dict:
+                    return track_dict[language_code]
+
+        # TranscriptList is only built here so the error lists the available languages
+        raise NoTranscriptFound(video_id, languages, TranscriptList.build(None, video_id, captions_json))
+
+    def _parse_transcript(self, raw_data: str) -> list[FetchedTranscriptSnippet]:
+        return [
+            FetchedTranscriptSnippet(
+                text=HTML_TAG_PATTERN.sub("", unescape(element.text)),
+                start=float(element.attrib["start"]),
+                duration=float(element.attrib.get("dur", "0.0")),
+            )
+            for element in ElementTree.fromstring(raw_data)
+            if element.text is not None
+        ]
+
+
+def create_transcript_client() -> AsyncTranscriptClient:
+    """Create AsyncTranscriptClient from environment variables."""
+    return AsyncTranscriptClient(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        timeout=float(os.getenv("HTTP_TIMEOUT", "15")),
+        base_url=youtube_base_url_from_env(),
+    )